@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+일별 로그 분석 도구
+
+greet_agent가 log/YYYY-MM-DD.log에 남긴 자유 형식 로그를 스트리밍으로 파싱해
+응답 지연 백분위수, 일별 성공/스킵/오류 비율, 성공한 인사 사이의 최대 공백을 계산합니다.
+파일은 한 줄씩 읽으므로 메모리 사용량은 로그 크기와 무관하게 일정하며,
+--jobs 옵션으로 여러 파일을 프로세스 풀에서 병렬 처리할 수 있습니다.
+
+사용법:
+    python analyze_logs.py                      # log/YYYY-MM-DD.log 전체 분석
+    python analyze_logs.py log/2025-10-*.log --jobs 4
+    python analyze_logs.py --json --top-gaps 10
+    python analyze_logs.py --backfill log/history.jsonl
+"""
+import os
+import sys
+import glob
+import json
+import heapq
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_LOG_PATTERN = os.path.join("log", "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9].log")
+READ_BUFFER_SIZE = 1024 * 1024
+
+# 로그 줄 접두사("[타임스탬프] ") 뒤에 오는 표식과 이벤트 종류
+# (앞에서부터 검사하므로 더 구체적인 표식을 먼저 둠)
+EVENT_MARKERS = (
+    (b"Claude responded (took ", "success"),
+    (b"SKIPPED:", "skipped"),
+    (b"RESCHEDULED:", "rescheduled"),
+    (b"FAILED TO RESCHEDULE:", "reschedule_failed"),
+    (b"Error greeting agent:", "error"),
+    (b"CANCELLED:", "cancelled"),
+)
+EVENT_KINDS = tuple(kind for _, kind in EVENT_MARKERS)
+MAX_MESSAGE_CHARS = 500
+
+
+class LatencyHistogram:
+    """
+    고정 해상도 지연 히스토그램
+
+    값 개수와 무관하게 메모리가 일정하고, 프로세스 간에 merge()로 합칠 수 있습니다.
+    백분위수는 해상도(resolution) 단위의 근사값입니다.
+    """
+
+    def __init__(self, resolution: float = 0.1, max_value: float = 600.0):
+        self.resolution = resolution
+        self.buckets = [0] * (int(max_value / resolution) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        # 부동소수점 오차로 경계값이 아래 버킷에 들어가지 않도록 작은 보정값을 더함
+        index = min(int(value / self.resolution + 1e-9), len(self.buckets) - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        for i, n in enumerate(other.buckets):
+            if n:
+                self.buckets[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * p / 100)))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(i * self.resolution, self.max)
+        return self.max
+
+    def summary(self, digits: int = 1) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, digits) if self.count else 0.0,
+            "p50": round(self.percentile(50), digits),
+            "p90": round(self.percentile(90), digits),
+            "p99": round(self.percentile(99), digits),
+            "max": round(self.max, digits),
+        }
+
+
+class FileStats:
+    """로그 파일 하나(또는 여러 파일을 합친) 분석 결과"""
+
+    def __init__(self, top_gaps: int = 5):
+        self.top_gaps = top_gaps
+        self.latency = LatencyHistogram()
+        self.days: Dict[str, Dict[str, int]] = {}
+        self.first_success: Optional[datetime] = None
+        self.last_success: Optional[datetime] = None
+        self.gaps: List[Tuple[float, str, str]] = []  # (초, 시작, 끝) 최소 힙
+
+    def day_counts(self, day: str) -> Dict[str, int]:
+        counts = self.days.get(day)
+        if counts is None:
+            counts = self.days[day] = dict.fromkeys(EVENT_KINDS, 0)
+        return counts
+
+    def add_success(self, timestamp: datetime, elapsed: Optional[float]):
+        if elapsed is not None:
+            self.latency.add(elapsed)
+        if self.last_success is not None:
+            self.add_gap(self.last_success, timestamp)
+        else:
+            self.first_success = timestamp
+        self.last_success = timestamp
+
+    def add_gap(self, start: datetime, end: datetime):
+        seconds = (end - start).total_seconds()
+        if len(self.gaps) < self.top_gaps:
+            heapq.heappush(self.gaps, (seconds, str(start), str(end)))
+        elif seconds > self.gaps[0][0]:
+            # 상위 N개에 들어가는 경우에만 문자열 생성
+            heapq.heapreplace(self.gaps, (seconds, str(start), str(end)))
+
+
+def iter_events(path: str) -> Iterator[Tuple[bytes, str, bytes]]:
+    """
+    로그 파일에서 이벤트 줄만 스트리밍으로 추출
+
+    Yields:
+        (타임스탬프 바이트, 이벤트 종류, 표식 이후의 나머지 내용)
+        여러 줄로 이어지는 응답/트레이스백의 연속 줄은 건너뜁니다.
+    """
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as f:
+        for line in f:
+            if line[:1] != b"[":
+                continue
+            end = line.find(b"] ", 1, 40)
+            if end < 0:
+                continue
+            start = end + 2
+            for marker, kind in EVENT_MARKERS:
+                if line.startswith(marker, start):
+                    yield line[1:end], kind, line[start + len(marker):].rstrip()
+                    break
+
+
+def parse_timestamp(raw: bytes) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(raw.decode("ascii"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def parse_elapsed(rest: bytes) -> Optional[float]:
+    """'3.2s): 응답...' 형태에서 소요 시간(초) 추출"""
+    end = rest.find(b"s)")
+    if end < 0:
+        return None
+    try:
+        return float(rest[:end])
+    except ValueError:
+        return None
+
+
+def analyze_file(path: str, top_gaps: int = 5, backfill_path: Optional[str] = None) -> FileStats:
+    """로그 파일 하나를 분석 (backfill_path가 주어지면 이벤트를 JSONL로 기록)"""
+    stats = FileStats(top_gaps)
+    out = open(backfill_path, "w", encoding="utf-8") if backfill_path else None
+    source = os.path.basename(path)
+
+    # 같은 날짜의 줄이 연속되므로 날짜가 바뀔 때만 집계 딕셔너리를 다시 찾음
+    current_day = None
+    counts = None
+
+    try:
+        for raw_ts, kind, rest in iter_events(path):
+            day = raw_ts[:10]
+            if day != current_day:
+                current_day = day
+                counts = stats.day_counts(day.decode("ascii", errors="replace"))
+            counts[kind] += 1
+
+            elapsed = None
+            timestamp = None
+            if kind == "success":
+                elapsed = parse_elapsed(rest)
+                timestamp = parse_timestamp(raw_ts)
+                if timestamp is not None:
+                    stats.add_success(timestamp, elapsed)
+
+            if out is not None:
+                record = {
+                    "timestamp": raw_ts.decode("ascii", errors="replace"),
+                    "event": kind,
+                    "source_file": source,
+                }
+                if kind == "success":
+                    record["elapsed_seconds"] = elapsed
+                    message = rest[rest.find(b"): ") + 3:] if b"): " in rest else b""
+                else:
+                    message = rest
+                record["message"] = message.decode("utf-8", errors="replace").strip()[:MAX_MESSAGE_CHARS]
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+
+    return stats
+
+
+def _analyze_worker(args: Tuple[str, int, Optional[str]]) -> Tuple[str, FileStats]:
+    path, top_gaps, backfill_path = args
+    return path, analyze_file(path, top_gaps, backfill_path)
+
+
+def combine(results: List[Tuple[str, FileStats]], top_gaps: int) -> FileStats:
+    """파일별 결과를 시간 순서대로 합치기 (파일 경계를 넘는 공백 포함)"""
+    total = FileStats(top_gaps)
+    ordered = sorted(
+        (stats for _, stats in results),
+        key=lambda stats: stats.first_success or datetime.max,
+    )
+    for stats in ordered:
+        total.latency.merge(stats.latency)
+        for day, counts in stats.days.items():
+            merged = total.days.setdefault(day, dict.fromkeys(EVENT_KINDS, 0))
+            for kind, n in counts.items():
+                merged[kind] += n
+        for entry in stats.gaps:
+            if len(total.gaps) < top_gaps:
+                heapq.heappush(total.gaps, entry)
+            elif entry > total.gaps[0]:
+                heapq.heapreplace(total.gaps, entry)
+        if stats.first_success is None:
+            continue
+        if total.last_success is not None:
+            total.add_gap(total.last_success, stats.first_success)
+        else:
+            total.first_success = stats.first_success
+        total.last_success = stats.last_success
+    return total
+
+
+def analyze(paths: List[str], jobs: int = 1, top_gaps: int = 5,
+            backfill_path: Optional[str] = None) -> FileStats:
+    """
+    여러 로그 파일을 분석 (jobs > 1이면 프로세스 풀 사용)
+
+    backfill_path가 주어지면 파일별 임시 파일에 이벤트를 기록한 뒤,
+    파일 이름(날짜) 순서로 이어 붙여 하나의 JSONL 히스토리를 만듭니다.
+    """
+    paths = sorted(paths)
+    parts = [f"{backfill_path}.part{i}" for i in range(len(paths))] if backfill_path else [None] * len(paths)
+    tasks = [(path, top_gaps, part) for path, part in zip(paths, parts)]
+
+    try:
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_analyze_worker, tasks))
+        else:
+            results = [_analyze_worker(task) for task in tasks]
+
+        if backfill_path:
+            with open(backfill_path, "w", encoding="utf-8") as out:
+                for part in parts:
+                    with open(part, "r", encoding="utf-8") as f:
+                        for line in f:
+                            out.write(line)
+    finally:
+        # 작업 중 오류가 나도 임시 파일은 남기지 않음
+        for part in parts:
+            if part and os.path.exists(part):
+                os.remove(part)
+
+    return combine(results, top_gaps)
+
+
+def build_report(stats: FileStats) -> dict:
+    """분석 결과를 JSON 직렬화 가능한 보고서로 변환"""
+    days = {}
+    for day in sorted(stats.days):
+        counts = stats.days[day]
+        attempts = counts["success"] + counts["error"] + counts["cancelled"]
+        total = attempts + counts["skipped"]
+        days[day] = {
+            **counts,
+            "success_rate": round(counts["success"] / attempts, 3) if attempts else None,
+            "error_rate": round(counts["error"] / attempts, 3) if attempts else None,
+            "skip_rate": round(counts["skipped"] / total, 3) if total else None,
+        }
+
+    totals = dict.fromkeys(EVENT_KINDS, 0)
+    for counts in stats.days.values():
+        for kind, n in counts.items():
+            totals[kind] += n
+
+    return {
+        "days": days,
+        "totals": totals,
+        "latency_seconds": stats.latency.summary(),
+        "largest_gaps": [
+            {"hours": round(seconds / 3600, 2), "from": start, "to": end}
+            for seconds, start, end in sorted(stats.gaps, reverse=True)
+        ],
+    }
+
+
+def print_report(report: dict):
+    print("=" * 60)
+    print("Claude Greeter Log Analysis")
+    print("=" * 60)
+
+    latency = report["latency_seconds"]
+    print(f"Latency ({latency['count']} responses): mean {latency['mean']}s, p50 {latency['p50']}s, "
+          f"p90 {latency['p90']}s, p99 {latency['p99']}s, max {latency['max']}s")
+    print(f"Totals: {', '.join(f'{kind}={n}' for kind, n in report['totals'].items())}")
+
+    print("\nPer day:")
+    for day, row in report["days"].items():
+        rate = f"{row['success_rate']:.0%}" if row["success_rate"] is not None else "-"
+        print(f"  {day}: success {row['success']}, skipped {row['skipped']}, "
+              f"error {row['error']}, cancelled {row['cancelled']} (success rate {rate})")
+
+    print("\nLargest gaps between successful greetings:")
+    for gap in report["largest_gaps"]:
+        print(f"  {gap['hours']}h  {gap['from']} -> {gap['to']}")
+    print("=" * 60)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze Claude Greeter daily logs")
+    parser.add_argument("paths", nargs="*", help=f"log files or glob patterns (default: {DEFAULT_LOG_PATTERN})")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="parallel worker processes")
+    parser.add_argument("--top-gaps", type=int, default=5, help="number of largest gaps to report")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--backfill", metavar="PATH", help="write all events to a JSONL history file")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for pattern in args.paths or [DEFAULT_LOG_PATTERN]:
+        matches = glob.glob(pattern)
+        paths.extend(matches if matches else [pattern] if os.path.exists(pattern) else [])
+    if not paths:
+        print("No log files found", file=sys.stderr)
+        return 1
+    # 겹치는 패턴/인자로 같은 파일이 두 번 분석되지 않도록 중복 제거
+    paths = sorted(set(os.path.normpath(path) for path in paths))
+
+    stats = analyze(paths, jobs=args.jobs, top_gaps=args.top_gaps, backfill_path=args.backfill)
+    report = build_report(stats)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if args.backfill:
+        print(f"History written to {args.backfill}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
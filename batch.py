@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+배치 프롬프트 실행기
+
+JSONL 파일(또는 표준 입력)의 프롬프트를 greet_agent와 같은 경로
+(enforce_rate_limit → query_claude_with_retry)로 제한된 동시성에서 실행하고,
+결과를 완료된 순서대로 출력 JSONL에 기록합니다.
+
+입력은 제너레이터로 한 줄씩 읽으므로 파일 크기와 무관하게 메모리가 일정하고,
+출력 파일이 체크포인트 역할을 하므로 중단 후 같은 명령을 다시 실행하면 이어서 처리합니다.
+성공한 줄만 완료로 보므로 다시 실행하면 오류가 난 프롬프트를 재시도하며,
+이 경우 출력에는 같은 줄 번호의 오류 기록과 성공 기록이 함께 남을 수 있습니다.
+API 호출 간격(log/next_api_call)과 사용량 집계(log/usage.json)는 실행 중인 서버와 파일로 공유됩니다.
+SPILL_OVERFLOW 설정 시 잘린 응답의 전체 텍스트는 <출력 파일>.responses/에 개수 제한 없이 보관되며,
+출력 기록의 spill_file이 그 파일을 가리킵니다.
+
+입력 형식 (한 줄에 하나):
+    {"id": "q1", "prompt": "Hello"}     # id는 생략 가능
+    "Hello"                             # JSON 문자열
+    Hello                               # 일반 텍스트
+
+사용법:
+    python batch.py prompts.jsonl -o results.jsonl -c 4
+    cat prompts.jsonl | python batch.py - -o results.jsonl
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from time import monotonic
+from typing import Iterator, Optional, TextIO, Tuple
+
+import main
+from main import enforce_rate_limit, query_claude_with_retry, usage_store
+from analyze_logs import LatencyHistogram
+from claude_agent_sdk import ClaudeAgentOptions
+
+DEFAULT_SYSTEM_PROMPT = "You are a friendly assistant. Keep responses brief."
+
+
+class CheckpointError(Exception):
+    """출력(체크포인트) 파일 중간에 읽을 수 없는 기록이 있음"""
+
+
+class CompletedLines:
+    """완료된 입력 줄 번호를 비트맵으로 기록 (100만 줄당 약 125KB)"""
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.count = 0
+
+    def add(self, line: int):
+        index, bit = divmod(line, 8)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index - len(self.bits) + 1))
+        if not self.bits[index] & (1 << bit):
+            self.bits[index] |= 1 << bit
+            self.count += 1
+
+    def __contains__(self, line: int) -> bool:
+        index, bit = divmod(line, 8)
+        return index < len(self.bits) and bool(self.bits[index] & (1 << bit))
+
+
+def load_checkpoint(output_path: str) -> CompletedLines:
+    """
+    기존 출력 파일에서 성공한 줄 번호를 읽어옴 (오류 기록은 다시 실행 대상)
+
+    중단 시 마지막 줄이 중간까지만 기록되었을 수 있으므로 줄바꿈으로 끝나지 않은
+    마지막 줄만 잘라냅니다. 그 밖의 읽을 수 없는 줄은 사용자 데이터를 지우지 않도록
+    CheckpointError로 중단합니다.
+    """
+    completed = CompletedLines()
+    if not os.path.exists(output_path):
+        return completed
+
+    valid_end = 0
+    with open(output_path, "rb") as f:
+        for record_no, raw in enumerate(f, 1):
+            if not raw.endswith(b"\n"):
+                # 마지막 줄만 줄바꿈 없이 끝날 수 있음
+                break
+            try:
+                record = json.loads(raw)
+                line_no = int(record["line"])
+            except (ValueError, KeyError, TypeError) as e:
+                raise CheckpointError(
+                    f"{output_path}:{record_no}: unreadable record ({e}). "
+                    f"Fix or remove that line, or use --no-resume to start over."
+                ) from None
+            if record.get("status") == "success":
+                completed.add(line_no)
+            valid_end += len(raw)
+
+    if valid_end < os.path.getsize(output_path):
+        print(f"[{datetime.now()}] Checkpoint: discarding incomplete record at end of {output_path}")
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_end)
+
+    return completed
+
+
+def iter_prompts(stream: TextIO, completed: CompletedLines) -> Iterator[Tuple[int, Optional[str], str]]:
+    """입력 스트림에서 아직 처리하지 않은 (줄 번호, id, 프롬프트)를 하나씩 생성"""
+    for line_no, raw in enumerate(stream, 1):
+        if line_no in completed:
+            continue
+        text = raw.strip()
+        if not text:
+            continue
+
+        prompt_id = None
+        prompt = text
+        if text[0] in "{\"":
+            try:
+                data = json.loads(text)
+            except ValueError:
+                data = text
+            if isinstance(data, dict):
+                prompt_id = data.get("id")
+                prompt = data.get("prompt", "")
+            elif isinstance(data, str):
+                prompt = data
+
+        if prompt:
+            yield line_no, prompt_id, prompt
+
+
+class BatchRunner:
+    """제한된 동시성으로 프롬프트를 실행하고 결과를 스트리밍으로 기록"""
+
+    def __init__(self, options: ClaudeAgentOptions, output: TextIO, concurrency: int):
+        self.options = options
+        self.output = output
+        self.concurrency = concurrency
+        self.latency = LatencyHistogram(resolution=0.01)  # 쿼리 시간 (재시도 포함)
+        self.wait = LatencyHistogram(resolution=0.01)  # 호출 간격 대기 시간
+        self.succeeded = 0
+        self.failed = 0
+
+    async def run(self, prompts: Iterator[Tuple[int, Optional[str], str]]):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+
+        # 입력 읽기는 스레드에서 수행 (표준 입력 대기 중에도 이벤트 루프가 멈추지 않도록)
+        while True:
+            item = await asyncio.to_thread(next, prompts, None)
+            if item is None:
+                break
+            await queue.put(item)
+
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            line_no, prompt_id, prompt = item
+            self._write(await self._run_one(line_no, prompt_id, prompt))
+            await usage_store.flush_async(only_if_due=True)
+
+    async def _run_one(self, line_no: int, prompt_id: Optional[str], prompt: str) -> dict:
+        record = {"line": line_no, "id": prompt_id}
+        # 호출 간격 대기와 쿼리 시간을 따로 측정 (대기는 --min-interval에 따라 달라지므로)
+        start = monotonic()
+        try:
+            await enforce_rate_limit()
+            waited = monotonic() - start
+            self.wait.add(waited)
+            record["wait_seconds"] = round(waited, 3)
+            start = monotonic()
+
+            result = await query_claude_with_retry(prompt, self.options, job="batch")
+            elapsed = monotonic() - start
+            self.latency.add(elapsed)
+            self.succeeded += 1
+            record.update({
+                "status": "success",
+                "response": result.text,
+                "response_bytes": result.total_bytes,
+                "response_sha256": result.sha256,
+                "truncated": result.truncated,
+                "elapsed_seconds": round(elapsed, 3),
+            })
+            if result.spill_file:
+                record["spill_file"] = result.spill_file
+            if result.usage:
+                record["usage"] = result.usage
+        except Exception as e:
+            self.failed += 1
+            record.update({
+                "status": "error",
+                "error": str(e),
+                "elapsed_seconds": round(monotonic() - start, 3),
+            })
+        return record
+
+    def _write(self, record: dict):
+        # 한 줄씩 기록하고 바로 flush하여 출력 파일이 항상 체크포인트로 쓸 수 있는 상태를 유지
+        self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+
+def print_summary(runner: BatchRunner, skipped: int, wall_seconds: float):
+    done = runner.succeeded + runner.failed
+    latency = runner.latency.summary(digits=2)
+    wait = runner.wait.summary(digits=2)
+    print("=" * 60)
+    print("Batch Summary")
+    print("=" * 60)
+    print(f"Processed: {done} (success {runner.succeeded}, error {runner.failed})")
+    print(f"Skipped (already succeeded in checkpoint): {skipped}")
+    print(f"Wall time: {wall_seconds:.1f}s")
+    print(f"Throughput: {done / wall_seconds if wall_seconds else 0:.2f} prompts/s")
+    print(f"Latency: mean {latency['mean']}s, p50 {latency['p50']}s, p90 {latency['p90']}s, "
+          f"p99 {latency['p99']}s, max {latency['max']}s")
+    print(f"Rate limit wait: mean {wait['mean']}s, p50 {wait['p50']}s, p90 {wait['p90']}s, "
+          f"p99 {wait['p99']}s, max {wait['max']}s")
+    print("=" * 60)
+
+
+async def run_batch(args) -> int:
+    options = ClaudeAgentOptions(
+        system_prompt=args.system_prompt,
+        max_turns=args.max_turns,
+        allowed_tools=[]
+    )
+
+    completed = load_checkpoint(args.output) if args.resume else CompletedLines()
+    if completed.count:
+        print(f"[{datetime.now()}] Resuming: {completed.count} prompts already succeeded in {args.output}")
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    output_stream = open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    runner = BatchRunner(options, output_stream, args.concurrency)
+    start = monotonic()
+
+    try:
+        await runner.run(iter_prompts(input_stream, completed))
+    finally:
+        output_stream.close()
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        await usage_store.flush_async()
+        print_summary(runner, completed.count, monotonic() - start)
+
+    return 0 if runner.failed == 0 else 1
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run prompts from JSONL through the greeter's retry/rate-limit pipeline")
+    parser.add_argument("input", help="input JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="output JSONL (also the resume checkpoint)")
+    parser.add_argument("-c", "--concurrency", type=int, default=2, help="maximum prompts in flight")
+    parser.add_argument("--system-prompt", default=DEFAULT_SYSTEM_PROMPT)
+    parser.add_argument("--max-turns", type=int, default=1)
+    parser.add_argument("--min-interval", type=float, default=None,
+                        help=f"minimum seconds between API calls (default: MIN_CALL_INTERVAL={main.MIN_CALL_INTERVAL})")
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="overwrite the output instead of resuming from it")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.min_interval is not None:
+        main.MIN_CALL_INTERVAL = args.min_interval
+    # 초과분 파일은 출력 기록이 가리키므로 배치 전용 디렉터리에 두고 정리하지 않음
+    # (서버의 log/responses 정리 대상에서도 제외됨)
+    main.RESPONSE_SPILL_DIR = args.output + ".responses"
+    main.RESPONSE_SPILL_MAX_FILES = 0
+
+    try:
+        return asyncio.run(run_batch(args))
+    except CheckpointError as e:
+        print(f"Checkpoint error: {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\nInterrupted. Run the same command again to resume.")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
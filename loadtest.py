@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+상태 엔드포인트 부하 테스트 도구
+
+keep-alive HTTP/1.1 연결 여러 개로 지정한 엔드포인트를 반복 호출해
+초당 요청 수와 지연 백분위수를 측정합니다. 외부 의존성 없이 asyncio만 사용하며,
+유닉스 소켓(UDS)으로 실행 중인 서버도 측정할 수 있습니다.
+
+사용법:
+    python loadtest.py                                  # http://127.0.0.1:8000/ 에 10초간 50개 연결
+    python loadtest.py --path /livez -c 100 -d 30
+    python loadtest.py --path /schedule --etag          # If-None-Match로 304 응답 경로 측정
+    python loadtest.py --uds /tmp/greeter.sock --path /readyz
+"""
+import sys
+import asyncio
+import argparse
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from analyze_logs import LatencyHistogram
+
+
+class LoadStats:
+    """부하 테스트 결과 (연결별 결과를 모두 합친 값)"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram(resolution=0.0001, max_value=10.0)
+        self.status_counts: Dict[int, int] = {}
+        self.errors = 0
+        self.reconnects = 0
+
+
+async def open_connection(args):
+    if args.uds:
+        return await asyncio.open_unix_connection(args.uds)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def read_response(reader: asyncio.StreamReader):
+    """상태 코드, 헤더(소문자 키), 본문을 읽음 (Content-Length 기반)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0"))
+    body = await reader.readexactly(length) if length else b""
+    return status, headers, body
+
+
+async def fetch_etag(args) -> Optional[str]:
+    reader, writer = await open_connection(args)
+    try:
+        writer.write(build_request(args, None))
+        await writer.drain()
+        _, headers, _ = await read_response(reader)
+        return headers.get("etag")
+    finally:
+        writer.close()
+
+
+def build_request(args, etag: Optional[str]) -> bytes:
+    host = "localhost" if args.uds else f"{args.host}:{args.port}"
+    request = f"GET {args.path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n"
+    if etag:
+        request += f"If-None-Match: {etag}\r\n"
+    return (request + "\r\n").encode("latin-1")
+
+
+async def worker(args, request: bytes, deadline: float, stats: LoadStats):
+    reader = writer = None
+    while monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await open_connection(args)
+            start = monotonic()
+            writer.write(request)
+            await writer.drain()
+            status, headers, _ = await read_response(reader)
+            stats.latency.add(monotonic() - start)
+            stats.status_counts[status] = stats.status_counts.get(status, 0) + 1
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+                writer = None
+                stats.reconnects += 1
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            stats.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run(args) -> Tuple[LoadStats, float]:
+    etag = await fetch_etag(args) if args.etag else None
+    request = build_request(args, etag)
+    stats = LoadStats()
+
+    # 워밍업 후 측정 시작
+    if args.warmup > 0:
+        await asyncio.gather(*(worker(args, request, monotonic() + args.warmup, LoadStats())
+                               for _ in range(args.connections)))
+
+    start = monotonic()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(args, request, deadline, stats) for _ in range(args.connections)))
+    return stats, monotonic() - start
+
+
+def print_report(args, stats: LoadStats, elapsed: float):
+    total = stats.latency.count
+    target = f"unix:{args.uds}{args.path}" if args.uds else f"http://{args.host}:{args.port}{args.path}"
+    print("=" * 60)
+    print(f"Load test: {target}")
+    print(f"Connections: {args.connections}, duration: {elapsed:.1f}s"
+          + (", If-None-Match: on" if args.etag else ""))
+    print("=" * 60)
+    print(f"Requests: {total} ({total / elapsed:.0f} req/s)")
+    print(f"Status codes: {', '.join(f'{code}={n}' for code, n in sorted(stats.status_counts.items()))}")
+    print(f"Errors: {stats.errors}, reconnects: {stats.reconnects}")
+    print(f"Latency (ms): p50 {stats.latency.percentile(50) * 1000:.2f}, "
+          f"p90 {stats.latency.percentile(90) * 1000:.2f}, "
+          f"p99 {stats.latency.percentile(99) * 1000:.2f}, "
+          f"max {stats.latency.max * 1000:.2f}")
+    print("=" * 60)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the greeter's status endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--uds", help="connect through a unix domain socket instead of TCP")
+    parser.add_argument("--path", default="/", help="endpoint to request (default: /)")
+    parser.add_argument("-c", "--connections", type=int, default=50, help="concurrent keep-alive connections")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="measurement duration in seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="warm-up seconds before measuring")
+    parser.add_argument("--etag", action="store_true", help="send If-None-Match with the endpoint's current ETag")
+    args = parser.parse_args(argv)
+
+    # 클라이언트가 병목이 되지 않도록 uvloop가 있으면 사용
+    try:
+        import uvloop
+        runner = uvloop.run
+    except (ImportError, AttributeError):
+        runner = asyncio.run
+
+    stats, elapsed = runner(run(args))
+    print_report(args, stats, elapsed)
+    return 0 if stats.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
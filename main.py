@@ -1,18 +1,52 @@
 import os
+import sys
+import signal
+import socket
 import asyncio
+import threading
+import json
+import random
+import logging
+import hashlib
+import importlib.util
 import traceback
 import subprocess
+import tracemalloc
+from dataclasses import dataclass
+from collections import deque
 from datetime import datetime, time, timedelta
-from contextlib import asynccontextmanager
-from typing import Optional
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows에는 fcntl 모듈이 없음 (프로세스 간 파일 잠금 없이 동작)
+    fcntl = None
+
+try:
+    import resource
+except ImportError:
+    # Windows에는 resource 모듈이 없음
+    resource = None
 
 import anyio
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from dotenv import load_dotenv
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
-from claude_agent_sdk import query, ClaudeAgentOptions
+from apscheduler.events import (
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_ERROR,
+    EVENT_JOB_SUBMITTED,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_MODIFIED,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_REMOVED,
+)
+from claude_agent_sdk import query, ClaudeAgentOptions, ResultMessage
 
 # Load environment variables
 load_dotenv()
@@ -24,14 +58,72 @@ PREVENT_START_TIME = os.getenv("PREVENT_START_TIME", None)
 PREVENT_END_TIME = os.getenv("PREVENT_END_TIME", None)
 LOG_DIR = "log"
 
+# 플릿 분산(스태거) 설정: 같은 START_TIME을 쓰는 여러 호스트의 실행 시각을 분산
+STAGGER_WINDOW_MINUTES = int(os.getenv("STAGGER_WINDOW_MINUTES", "0"))  # 0이면 분산하지 않음
+STAGGER_KEY = os.getenv("STAGGER_KEY") or socket.gethostname()  # 오프셋 계산용 인스턴스 키
+JITTER_SECONDS = int(os.getenv("JITTER_SECONDS", "0"))  # 실행마다 추가되는 무작위 지연 (최대값)
+
 # 재시도 및 타임아웃 설정
 MAX_RETRIES = 3
 RETRY_DELAYS = [2, 4, 8]  # 초 단위 (지수 백오프)
 API_TIMEOUT = 60  # 초 단위
-MIN_CALL_INTERVAL = 10  # API 호출 간 최소 간격 (초)
+MIN_CALL_INTERVAL = float(os.getenv("MIN_CALL_INTERVAL", "10"))  # API 호출 간 최소 간격 (초)
+RATE_LIMIT_FILE = os.path.join(LOG_DIR, "next_api_call")  # 서버/배치 프로세스가 공유하는 다음 호출 가능 시각
+
+# 응답 크기 제한 설정
+MAX_RESPONSE_BYTES = int(os.getenv("MAX_RESPONSE_BYTES", "65536"))  # 메모리/로그에 보관할 최대 바이트
+SPILL_OVERFLOW = os.getenv("SPILL_OVERFLOW", "false").lower() in ("1", "true", "yes")
+RESPONSE_SPILL_DIR = os.path.join(LOG_DIR, "responses")
+RESPONSE_SPILL_MAX_FILES = int(os.getenv("RESPONSE_SPILL_MAX_FILES", "100"))  # 보관할 초과분 파일 최대 개수 (0이면 무제한)
+
+# 사용량(토큰/비용) 집계 설정
+USAGE_FILE = os.path.join(LOG_DIR, "usage.json")
+USAGE_RETENTION_DAYS = int(os.getenv("USAGE_RETENTION_DAYS", "90"))
+USAGE_FLUSH_INTERVAL = 5  # 사용량 파일 최소 저장 간격 (초)
+USAGE_TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+# 종료(드레인) 설정
+SHUTDOWN_GRACE_SECONDS = int(os.getenv("SHUTDOWN_GRACE_SECONDS", "75"))  # 진행 중인 인사를 기다리는 최대 시간
+REUSE_PORT = os.getenv("REUSE_PORT", "false").lower() in ("1", "true", "yes")  # 무중단 재시작용 SO_REUSEPORT
+TAKEOVER_PID = int(os.getenv("TAKEOVER_PID", "0")) or None  # restart.sh가 지정: 이 프로세스가 끝날 때까지 스케줄러 일시 정지
+
+# 서버 프로파일 설정 ("default" 또는 "performance")
+# performance 프로파일은 아래 값들의 기본값만 바꾸며, 각 값은 환경 변수로 개별 지정할 수 있음
+SERVER_PROFILE = os.getenv("SERVER_PROFILE", "default").lower()
+_PERFORMANCE = SERVER_PROFILE == "performance"
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+UDS = os.getenv("UDS") or None  # 로컬 리버스 프록시용 유닉스 소켓 경로 (설정 시 HOST/PORT 대신 사용)
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "75" if _PERFORMANCE else "5"))
+BACKLOG = int(os.getenv("BACKLOG", "4096" if _PERFORMANCE else "2048"))
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0")) or None  # 초과 시 503 반환 (0이면 제한 없음)
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.01" if _PERFORMANCE else "1.0"))
+
+# 이벤트 루프 지연(lag) 모니터 설정
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR", "true").lower() in ("1", "true", "yes")
+LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))  # 하트비트 주기
+LOOP_LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))  # 이 이상 지연되면 스택 캡처
+LOOP_LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# 리소스(메모리, 파일 디스크립터, 하위 프로세스, 태스크) 샘플링 설정
+RESOURCE_SAMPLE_SECONDS = int(os.getenv("RESOURCE_SAMPLE_SECONDS", "60"))
+RESOURCE_HISTORY_SIZE = int(os.getenv("RESOURCE_HISTORY_SIZE", "1440"))  # 기본 60초 간격으로 하루치
 
 # 마지막 API 호출 시간 추적
 last_api_call_time: Optional[datetime] = None
+rate_limit_lock = asyncio.Lock()  # 동시 호출자(배치 워커 등)가 간격 검사를 순서대로 통과하도록 보장
+
+# 드레인 상태 및 진행 중인 인사 작업
+draining = False
+drain_deadline: Optional[float] = None
+in_flight_greetings = set()
+drain_started = asyncio.Event()  # 드레인 시작 시 설정 (지터 대기 중인 인사를 깨움)
+event_loop: Optional[asyncio.AbstractEventLoop] = None  # 신호 처리기에서 작업을 넘길 이벤트 루프
 
 # Create log directory if it doesn't exist
 if not os.path.exists(LOG_DIR):
@@ -83,21 +175,392 @@ async def cleanup_stale_processes():
         print(f"[{datetime.now()}] Warning: Process cleanup failed: {e}")
 
 
+@dataclass
+class QueryResult:
+    """Claude 쿼리 결과 (크기 제한이 적용된 응답 텍스트와 메타데이터)"""
+    text: str
+    total_bytes: int
+    kept_bytes: int
+    sha256: str
+    truncated: bool
+    spill_file: Optional[str] = None
+    usage: Optional[dict] = None
+
+
+class ResponseBuffer:
+    """
+    스트리밍 응답을 청크 리스트에 누적하는 버퍼
+
+    MAX_RESPONSE_BYTES까지만 메모리에 보관하고, 초과분은 버리거나
+    (SPILL_OVERFLOW 설정 시) 별도 파일로 기록합니다.
+    전체 길이와 SHA-256 다이제스트는 잘린 부분까지 포함해 계산합니다.
+    """
+
+    def __init__(self, max_bytes: int = MAX_RESPONSE_BYTES, spill: bool = SPILL_OVERFLOW):
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self.chunks: List[str] = []
+        self.kept_bytes = 0
+        self.total_bytes = 0
+        self.truncated = False
+        self.spill_file: Optional[str] = None
+        self._spill_handle = None
+        self._digest = hashlib.sha256()
+
+    def append(self, text: str):
+        data = text.encode("utf-8")
+        self.total_bytes += len(data)
+        self._digest.update(data)
+
+        if not self.truncated:
+            room = self.max_bytes - self.kept_bytes
+            if len(data) <= room:
+                self.chunks.append(text)
+                self.kept_bytes += len(data)
+                return
+
+            # 제한 초과: 남은 공간만큼만 보관 (UTF-8 문자 경계 유지)
+            head = data[:room].decode("utf-8", errors="ignore")
+            self.chunks.append(head)
+            self.kept_bytes += len(head.encode("utf-8"))
+            self.truncated = True
+            if self.spill:
+                self._open_spill()
+
+        if self._spill_handle:
+            self._spill_handle.write(text)
+
+    def _open_spill(self):
+        """초과분 기록용 파일 생성 (이미 보관된 앞부분 포함)"""
+        try:
+            os.makedirs(RESPONSE_SPILL_DIR, exist_ok=True)
+            if RESPONSE_SPILL_MAX_FILES > 0:
+                prune_spill_files(RESPONSE_SPILL_MAX_FILES - 1)
+            self.spill_file = os.path.join(
+                RESPONSE_SPILL_DIR, f"{datetime.now().strftime('%Y-%m-%d_%H%M%S_%f')}.txt"
+            )
+            self._spill_handle = open(self.spill_file, "w", encoding="utf-8")
+            # 현재 청크는 이미 잘린 상태이므로 앞부분만 먼저 기록하고, 나머지는 append에서 이어서 기록
+            self._spill_handle.write("".join(self.chunks[:-1]))
+        except OSError as e:
+            print(f"[{datetime.now()}] Warning: Could not open response spill file: {e}")
+            self.spill_file = None
+            self._spill_handle = None
+
+    def close(self):
+        if self._spill_handle:
+            self._spill_handle.close()
+            self._spill_handle = None
+
+    def discard(self):
+        """실패한 시도의 버퍼 정리 (부분 응답이 기록된 초과분 파일 삭제)"""
+        self.close()
+        if self.spill_file:
+            try:
+                os.remove(self.spill_file)
+            except OSError:
+                pass
+            self.spill_file = None
+
+    def result(self, usage: Optional[dict] = None) -> QueryResult:
+        self.close()
+        return QueryResult(
+            text="".join(self.chunks),
+            total_bytes=self.total_bytes,
+            kept_bytes=self.kept_bytes,
+            sha256=self._digest.hexdigest(),
+            truncated=self.truncated,
+            spill_file=self.spill_file,
+            usage=usage,
+        )
+
+
+def prune_spill_files(keep: int):
+    """가장 최근 keep개만 남기고 오래된 초과분 파일 삭제 (파일 이름이 생성 시각 순)"""
+    try:
+        names = sorted(name for name in os.listdir(RESPONSE_SPILL_DIR) if name.endswith(".txt"))
+    except OSError:
+        return
+    for name in names[:max(0, len(names) - keep)]:
+        try:
+            os.remove(os.path.join(RESPONSE_SPILL_DIR, name))
+        except OSError as e:
+            print(f"[{datetime.now()}] Warning: Could not remove old spill file {name}: {e}")
+
+
+@contextmanager
+def file_lock(path: str):
+    """프로세스 간 배타적 파일 잠금 (fcntl이 없으면 잠금 없이 진행)"""
+    with open(path, "a") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def _empty_usage_totals() -> dict:
+    totals = {"attempts": 0, "successes": 0, "failures": 0}
+    totals.update({field: 0 for field in USAGE_TOKEN_FIELDS})
+    totals.update({"wall_ms": 0, "api_ms": 0, "cost_usd": 0.0})
+    return totals
+
+
+def _add_attempt(totals: dict, attempt: dict):
+    totals["attempts"] += 1
+    if attempt["status"] == "success":
+        totals["successes"] += 1
+    else:
+        totals["failures"] += 1
+    for field in USAGE_TOKEN_FIELDS + ("wall_ms", "api_ms"):
+        totals[field] += attempt.get(field) or 0
+    totals["cost_usd"] = round(totals["cost_usd"] + (attempt.get("cost_usd") or 0.0), 6)
+
+
+def _merge_usage(totals: dict, delta: dict):
+    for field, value in delta.items():
+        totals[field] = totals.get(field, 0) + value
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+
+
+def _merge_pending(jobs: Dict[str, dict], days: Dict[str, Dict[str, dict]],
+                   pending_jobs: Dict[str, dict], pending_days: Dict[str, Dict[str, dict]]):
+    """작업별/일별 증가분을 누계에 더함"""
+    for job, delta in pending_jobs.items():
+        _merge_usage(jobs.setdefault(job, _empty_usage_totals()), delta)
+    for day, day_jobs in pending_days.items():
+        for job, delta in day_jobs.items():
+            _merge_usage(days.setdefault(day, {}).setdefault(job, _empty_usage_totals()), delta)
+
+
+class UsageStore:
+    """
+    시도(attempt)별 토큰/시간/비용을 작업별·일별로 집계하는 저장소
+
+    log/usage.json 하나에 집계값만 보관하므로 크기가 작고,
+    USAGE_RETENTION_DAYS보다 오래된 일별 집계는 자동으로 정리됩니다.
+    최근 시도 기록은 메모리에만 유지합니다.
+
+    서버와 배치 실행, 재시작 중인 두 인스턴스가 같은 파일을 쓰므로,
+    저장할 때는 잠금을 잡고 파일을 다시 읽은 뒤 이 프로세스의 증가분만 더합니다.
+    """
+
+    def __init__(self, path: str = USAGE_FILE):
+        self.path = path
+        self.jobs: Dict[str, dict] = {}
+        self.days: Dict[str, Dict[str, dict]] = {}
+        self.pending_jobs: Dict[str, dict] = {}  # 마지막 저장 이후 이 프로세스의 증가분
+        self.pending_days: Dict[str, Dict[str, dict]] = {}
+        self.recent = deque(maxlen=20)
+        self.dirty = False
+        self.last_flush = 0.0
+        try:
+            self.jobs, self.days = self._read()
+        except OSError as e:
+            print(f"[{datetime.now()}] Warning: Could not load usage store {self.path}: {e}")
+
+    def _read(self) -> Tuple[Dict[str, dict], Dict[str, Dict[str, dict]]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("jobs", {}), data.get("days", {})
+        except FileNotFoundError:
+            return {}, {}
+        except ValueError as e:
+            print(f"[{datetime.now()}] Warning: Ignoring unreadable usage store {self.path}: {e}")
+            return {}, {}
+
+    def record(self, job: str, attempt: dict):
+        """시도 한 건을 작업별 누계와 오늘 날짜 누계에 반영"""
+        day = datetime.now().strftime('%Y-%m-%d')
+        for jobs, days in ((self.jobs, self.days), (self.pending_jobs, self.pending_days)):
+            _add_attempt(jobs.setdefault(job, _empty_usage_totals()), attempt)
+            _add_attempt(days.setdefault(day, {}).setdefault(job, _empty_usage_totals()), attempt)
+
+        self.recent.append({"job": job, **attempt})
+        self.dirty = True
+
+    def flush(self):
+        """이 프로세스의 증가분을 파일에 저장 (이벤트 루프 밖에서 사용, 루프에서는 flush_async 사용)"""
+        if not self.dirty:
+            return
+        pending = self._take_pending()
+        try:
+            merged = self._write(*pending)
+        except OSError as e:
+            self._restore(pending, e)
+            return
+        self._apply(merged)
+
+    async def flush_async(self, only_if_due: bool = False):
+        """
+        flush()의 이벤트 루프용 버전
+
+        다른 프로세스가 잠금을 잡고 있으면 기다려야 하므로 잠금과 파일 읽기/쓰기는 스레드에서 수행합니다.
+        only_if_due가 True이면 마지막 저장 후 USAGE_FLUSH_INTERVAL이 지난 경우에만 저장합니다.
+        """
+        if not self.dirty or (only_if_due and monotonic() - self.last_flush < USAGE_FLUSH_INTERVAL):
+            return
+        pending = self._take_pending()
+        try:
+            merged = await asyncio.to_thread(self._write, *pending)
+        except OSError as e:
+            self._restore(pending, e)
+            return
+        self._apply(merged)
+
+    def _take_pending(self) -> Tuple[Dict[str, dict], Dict[str, Dict[str, dict]]]:
+        """저장할 증가분을 꺼냄 (저장 중에 기록되는 시도는 새 증가분에 쌓임)"""
+        pending = (self.pending_jobs, self.pending_days)
+        self.pending_jobs, self.pending_days = {}, {}
+        self.dirty = False
+        return pending
+
+    def _write(self, pending_jobs: Dict[str, dict], pending_days: Dict[str, Dict[str, dict]]):
+        """잠금을 잡고 파일의 최신 집계에 증가분을 더해 저장 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with file_lock(self.path + ".lock"):
+            jobs, days = self._read()
+            _merge_pending(jobs, days, pending_jobs, pending_days)
+            self._prune(days)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"jobs": jobs, "days": days}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        return jobs, days
+
+    def _apply(self, merged):
+        jobs, days = merged
+        # 저장하는 동안 새로 기록된 증가분도 메모리 집계에 반영
+        _merge_pending(jobs, days, self.pending_jobs, self.pending_days)
+        self.jobs, self.days = jobs, days
+        self.last_flush = monotonic()
+
+    def _restore(self, pending, error: OSError):
+        """저장 실패 시 증가분을 되돌려 다음 저장에서 다시 시도"""
+        _merge_pending(self.pending_jobs, self.pending_days, *pending)
+        self.dirty = True
+        print(f"[{datetime.now()}] Warning: Could not save usage store {self.path}: {error}")
+
+    @staticmethod
+    def _prune(days: Dict[str, Dict[str, dict]]):
+        cutoff = (datetime.now() - timedelta(days=USAGE_RETENTION_DAYS)).strftime('%Y-%m-%d')
+        for day in [d for d in days if d < cutoff]:
+            del days[day]
+
+    def summary(self, days: int = 7) -> dict:
+        """작업별 누계, 최근 N일 집계, 최근 시도 목록 반환"""
+        recent_days = sorted(self.days)[-days:] if days > 0 else []
+        return {
+            "jobs": {job: _describe_usage(totals) for job, totals in self.jobs.items()},
+            "days": {
+                day: {job: _describe_usage(totals) for job, totals in self.days[day].items()}
+                for day in recent_days
+            },
+            "recent_attempts": list(self.recent),
+        }
+
+
+def _describe_usage(totals: dict) -> dict:
+    """집계값에 평균 및 캐시 적중률 같은 파생 지표 추가"""
+    attempts = totals["attempts"] or 1
+    prompt_tokens = (
+        totals["input_tokens"]
+        + totals["cache_creation_input_tokens"]
+        + totals["cache_read_input_tokens"]
+    )
+    return {
+        **totals,
+        "avg_wall_ms": round(totals["wall_ms"] / attempts, 1),
+        "avg_api_ms": round(totals["api_ms"] / attempts, 1),
+        "avg_cost_usd": round(totals["cost_usd"] / attempts, 6),
+        "cache_read_ratio": round(totals["cache_read_input_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+    }
+
+
+def _usage_from_result(message) -> dict:
+    """SDK ResultMessage에서 토큰/시간/비용 정보 추출"""
+    usage = getattr(message, "usage", None) or {}
+    attempt = {field: int(usage.get(field) or 0) for field in USAGE_TOKEN_FIELDS}
+    attempt["api_ms"] = getattr(message, "duration_api_ms", 0) or 0
+    attempt["duration_ms"] = getattr(message, "duration_ms", 0) or 0
+    attempt["cost_usd"] = getattr(message, "total_cost_usd", None) or 0.0
+    attempt["num_turns"] = getattr(message, "num_turns", 0) or 0
+    return attempt
+
+
+usage_store = UsageStore()
+
+
+def _reserve_api_call_slot() -> float:
+    """
+    공유 파일의 다음 호출 가능 시각 이후로 호출 슬롯을 예약
+
+    예약한 프로세스는 슬롯 뒤로 자신의 MIN_CALL_INTERVAL만큼 다음 가능 시각을 미룹니다.
+    슬롯은 요청 순서대로 배정되므로 간격이 짧은 프로세스(예: --min-interval 1 배치)가
+    간격이 긴 프로세스(서버)를 계속 밀어내지 못합니다.
+
+    Returns:
+        예약한 슬롯까지 기다려야 하는 시간(초)
+    """
+    with file_lock(RATE_LIMIT_FILE + ".lock"):
+        try:
+            with open(RATE_LIMIT_FILE, "r") as f:
+                next_allowed = float(f.read().strip() or 0)
+        except (OSError, ValueError):
+            next_allowed = 0.0
+
+        now = datetime.now().timestamp()
+        # 프로세스마다 예약은 하나뿐이므로 한 시간 이상 미래 값은 시계가 뒤로 이동한 것으로 보고 무시
+        if next_allowed - now > 3600:
+            next_allowed = 0.0
+        slot = max(now, next_allowed)
+
+        with open(RATE_LIMIT_FILE, "w") as f:
+            f.write(str(slot + MIN_CALL_INTERVAL))
+        return slot - now
+
+
 async def enforce_rate_limit():
-    """API 호출 간 최소 간격 보장"""
-    global last_api_call_time
+    """
+    API 호출 간 최소 간격 보장
 
-    if last_api_call_time:
-        elapsed = (datetime.now() - last_api_call_time).total_seconds()
-        if elapsed < MIN_CALL_INTERVAL:
-            wait_time = MIN_CALL_INTERVAL - elapsed
-            print(f"[{datetime.now()}] Rate limit: waiting {wait_time:.1f}s before API call...")
-            await asyncio.sleep(wait_time)
+    같은 프로세스의 동시 호출자는 rate_limit_lock으로, 서버와 배치 실행처럼 다른 프로세스는
+    RATE_LIMIT_FILE의 슬롯 예약으로 간격을 공유합니다. 각 호출 뒤에는 그 호출을 한 프로세스의
+    MIN_CALL_INTERVAL만큼 간격이 보장되며, 파일을 쓸 수 없으면 프로세스 안에서만 간격을 지킵니다.
+    """
+    global last_api_call_time
 
-    last_api_call_time = datetime.now()
+    async with rate_limit_lock:
+        try:
+            wait_time = await asyncio.to_thread(_reserve_api_call_slot)
+            if wait_time > 0:
+                print(f"[{datetime.now()}] Rate limit: waiting {wait_time:.1f}s before API call...")
+                await asyncio.sleep(wait_time)
+        except OSError as e:
+            print(f"[{datetime.now()}] Warning: Shared rate limit unavailable, using per-process limit: {e}")
+            if last_api_call_time:
+                elapsed = (datetime.now() - last_api_call_time).total_seconds()
+                if elapsed < MIN_CALL_INTERVAL:
+                    wait_time = MIN_CALL_INTERVAL - elapsed
+                    print(f"[{datetime.now()}] Rate limit: waiting {wait_time:.1f}s before API call...")
+                    await asyncio.sleep(wait_time)
+
+        last_api_call_time = datetime.now()
+
+
+def record_attempt(job: str, attempt: int, status: str, started: float, usage: Optional[dict]):
+    """쿼리 시도 한 건의 사용량을 UsageStore에 기록"""
+    entry = {
+        "timestamp": str(datetime.now()),
+        "attempt": attempt,
+        "status": status,
+        "wall_ms": int((monotonic() - started) * 1000),
+    }
+    if usage:
+        entry.update(usage)
+    usage_store.record(job, entry)
 
 
-async def query_claude_with_retry(prompt: str, options: ClaudeAgentOptions, attempt: int = 1) -> str:
+async def query_claude_with_retry(prompt: str, options: ClaudeAgentOptions, attempt: int = 1,
+                                  job: str = "adhoc") -> QueryResult:
     """
     재시도 로직이 포함된 Claude 쿼리 함수
 
@@ -105,40 +568,55 @@ async def query_claude_with_retry(prompt: str, options: ClaudeAgentOptions, atte
         prompt: 전송할 프롬프트
         options: Claude Agent 옵션
         attempt: 현재 시도 횟수 (내부 사용)
+        job: 사용량 집계에 사용할 작업 이름
 
     Returns:
-        Claude의 응답 텍스트
+        크기 제한이 적용된 응답 텍스트와 전체 길이/다이제스트를 담은 QueryResult
 
     Raises:
         Exception: 모든 재시도 실패 시
     """
+    # 시도마다 새 버퍼 사용 (실패한 시도의 부분 응답은 버림)
+    buffer = ResponseBuffer()
+    usage = None
+    started = monotonic()
     try:
         # 타임아웃과 함께 쿼리 실행
-        full_response = ""
-
         async def run_query():
-            nonlocal full_response
+            nonlocal usage
             async for message in query(prompt=prompt, options=options):
-                if hasattr(message, 'content'):
+                if isinstance(message, ResultMessage):
+                    usage = _usage_from_result(message)
+                elif hasattr(message, 'content'):
                     for block in message.content:
                         if hasattr(block, 'text'):
-                            full_response += block.text
+                            buffer.append(block.text)
 
         # 타임아웃 적용
         await asyncio.wait_for(run_query(), timeout=API_TIMEOUT)
 
-        return full_response
+        record_attempt(job, attempt, "success", started, usage)
+        return buffer.result(usage)
+
+    except asyncio.CancelledError:
+        buffer.discard()
+        record_attempt(job, attempt, "cancelled", started, usage)
+        raise
 
     except asyncio.TimeoutError:
+        buffer.discard()
+        record_attempt(job, attempt, "timeout", started, usage)
         error_msg = f"Timeout after {API_TIMEOUT}s"
         if attempt < MAX_RETRIES:
             delay = RETRY_DELAYS[attempt - 1]
             print(f"[{datetime.now()}] Attempt {attempt} failed: {error_msg}. Retrying in {delay}s...")
             await asyncio.sleep(delay)
-            return await query_claude_with_retry(prompt, options, attempt + 1)
+            return await query_claude_with_retry(prompt, options, attempt + 1, job)
         raise Exception(f"{error_msg} (all {MAX_RETRIES} attempts failed)")
 
     except Exception as e:
+        buffer.discard()
+        record_attempt(job, attempt, "error", started, usage)
         error_msg = str(e)
         if attempt < MAX_RETRIES:
             delay = RETRY_DELAYS[attempt - 1]
@@ -148,12 +626,45 @@ async def query_claude_with_retry(prompt: str, options: ClaudeAgentOptions, atte
             await cleanup_stale_processes()
             await asyncio.sleep(delay)
 
-            return await query_claude_with_retry(prompt, options, attempt + 1)
+            return await query_claude_with_retry(prompt, options, attempt + 1, job)
         raise Exception(f"{error_msg} (all {MAX_RETRIES} attempts failed)")
 
 
-async def greet_agent():
-    """Send 'hi' message to Claude agent and log response"""
+async def greet_agent(source: str = "scheduled"):
+    """
+    Send 'hi' message to Claude agent and log response
+
+    실행 중인 인사 작업을 in_flight_greetings에 등록해 종료 시 드레인할 수 있게 하고,
+    드레인이 시작된 뒤에는 새 인사를 시작하지 않습니다.
+    예약 실행에는 JITTER_SECONDS 이내의 무작위 지연을 먼저 적용하며, 지연 중에 드레인이
+    시작되면 (이미 예정 시각이 지난 인사이므로) 기다리지 않고 바로 실행합니다.
+    """
+    if draining:
+        skip_message = f"[{datetime.now()}] SKIPPED: Greeting not started because the server is shutting down."
+        print(skip_message)
+        log_file_path = os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y-%m-%d')}.log")
+        with open(log_file_path, "a", encoding="utf-8") as f:
+            f.write(skip_message + "\n")
+        return {"status": "skipped", "reason": "Server is shutting down."}
+
+    task = asyncio.current_task()
+    in_flight_greetings.add(task)
+    try:
+        if source == "scheduled" and JITTER_SECONDS:
+            delay = jitter_delay()
+            print(f"[{datetime.now()}] Jitter: starting scheduled greeting in {delay:.0f}s")
+            try:
+                await asyncio.wait_for(drain_started.wait(), timeout=delay)
+                print(f"[{datetime.now()}] Jitter: delay cut short by shutdown, starting greeting now")
+            except asyncio.TimeoutError:
+                pass
+        return await _greet_agent(source)
+    finally:
+        in_flight_greetings.discard(task)
+
+
+async def _greet_agent(source: str):
+    """greet_agent의 실제 인사 로직"""
     log_file_path = os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y-%m-%d')}.log")
 
     # 예방 윈도우 체크
@@ -181,6 +692,7 @@ async def greet_agent():
             # 내일의 START_TIME 계산
             tomorrow = now + timedelta(days=1)
             next_start_time = tomorrow.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            next_start_time += timedelta(seconds=STAGGER_OFFSET_SECONDS)
 
             # 만약 계산된 시간이 과거이면 하루 더 추가
             if next_start_time < now:
@@ -188,7 +700,7 @@ async def greet_agent():
 
             scheduler.reschedule_job(
                 'greet_agent_job',
-                trigger=IntervalTrigger(hours=5, start_date=next_start_time, timezone=scheduler.timezone)
+                trigger=build_interval_trigger(next_start_time)
             )
             
             new_job = scheduler.get_job('greet_agent_job')
@@ -244,16 +756,35 @@ async def greet_agent():
 
         # 재시도 로직이 포함된 쿼리 실행
         start_time = datetime.now()
-        full_response = await query_claude_with_retry("Hi!", options)
+        result = await query_claude_with_retry("Hi!", options, job=source)
         elapsed = (datetime.now() - start_time).total_seconds()
 
-        log_message = f"[{datetime.now()}] Claude responded (took {elapsed:.1f}s): {full_response}\n"
+        log_message = f"[{datetime.now()}] Claude responded (took {elapsed:.1f}s): {result.text}\n"
+        if result.truncated:
+            log_message += (
+                f"[{datetime.now()}] TRUNCATED: response was {result.total_bytes} bytes "
+                f"(kept {result.kept_bytes}), sha256={result.sha256}"
+                + (f", full text in {result.spill_file}" if result.spill_file else "")
+                + "\n"
+            )
         print(log_message.strip())
 
         with open(log_file_path, "a", encoding="utf-8") as f:
             f.write(log_message)
 
-        return {"status": "success", "response": full_response, "elapsed_seconds": elapsed}
+        response = {
+            "status": "success",
+            "response": result.text,
+            "response_bytes": result.total_bytes,
+            "response_sha256": result.sha256,
+            "truncated": result.truncated,
+            "elapsed_seconds": elapsed
+        }
+        if result.spill_file:
+            response["spill_file"] = result.spill_file
+        if result.usage:
+            response["usage"] = result.usage
+        return response
 
     except Exception as e:
         error_msg = f"Error greeting agent: {str(e)}"
@@ -266,6 +797,52 @@ async def greet_agent():
 
         return {"status": "error", "message": error_msg}
 
+    except asyncio.CancelledError:
+        # 종료 드레인 기한 초과로 취소된 경우에도 기록을 남김
+        cancel_message = f"[{datetime.now()}] CANCELLED: Greeting cancelled during shutdown\n"
+        print(cancel_message.strip())
+        with open(log_file_path, "a", encoding="utf-8") as f:
+            f.write(cancel_message)
+        raise
+
+    finally:
+        # 이번 인사에서 발생한 사용량 집계 저장
+        await usage_store.flush_async()
+
+
+def calculate_stagger_offset(key: str = STAGGER_KEY, window_minutes: int = STAGGER_WINDOW_MINUTES) -> int:
+    """
+    인스턴스 키에서 결정적인 스태거 오프셋(초) 계산
+
+    같은 키는 항상 같은 오프셋을 받고, 서로 다른 키는 윈도우 안에 고르게 분산됩니다.
+    """
+    if window_minutes <= 0:
+        return 0
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % (window_minutes * 60)
+
+
+STAGGER_OFFSET_SECONDS = calculate_stagger_offset()
+
+
+def build_interval_trigger(start_date: datetime) -> IntervalTrigger:
+    """
+    5시간 간격 트리거 생성
+
+    트리거 자체에는 지터를 넣지 않습니다. APScheduler는 이전 실행 시각(지터 포함)에 간격을 더해
+    다음 실행을 계산하므로 지연이 실행마다 누적되기 때문입니다. 지터는 greet_agent에서 실행마다 적용합니다.
+    """
+    return IntervalTrigger(
+        hours=5,
+        start_date=start_date,
+        timezone=scheduler.timezone
+    )
+
+
+def jitter_delay() -> float:
+    """예약 실행 한 번에 적용할 무작위 지연(초), 0 ~ JITTER_SECONDS"""
+    return random.uniform(0, JITTER_SECONDS)
+
 
 def calculate_next_run_time():
     """Calculate the next scheduled run time based on START_TIME."""
@@ -274,8 +851,9 @@ def calculate_next_run_time():
         # Use the scheduler's timezone for an accurate 'now'
         now = datetime.now(scheduler.timezone)
         
-        # Get today's START_TIME as the first potential run time
+        # Get today's START_TIME (plus this instance's stagger offset) as the first potential run time
         next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        next_run += timedelta(seconds=STAGGER_OFFSET_SECONDS)
 
         # If today's START_TIME has already passed, find the next 5-hour interval in the future
         while next_run < now:
@@ -287,6 +865,14 @@ def calculate_next_run_time():
         raise ValueError(f"Invalid START_TIME format: {START_TIME}. Use HH:MM (24-hour format)")
 
 
+@lru_cache(maxsize=8)
+def _parse_prevent_window(start: str, end: str) -> Tuple[time, time]:
+    """예방 윈도우 문자열(HH:MM)을 time 객체로 파싱 (설정값이 바뀔 때만 다시 파싱)"""
+    prevent_start_hour, prevent_start_min = map(int, start.split(":"))
+    prevent_end_hour, prevent_end_min = map(int, end.split(":"))
+    return time(prevent_start_hour, prevent_start_min), time(prevent_end_hour, prevent_end_min)
+
+
 def is_in_prevent_window(check_time: datetime = None) -> bool:
     """
     예방 시간대에 실행 중인지 확인
@@ -307,11 +893,7 @@ def is_in_prevent_window(check_time: datetime = None) -> bool:
         current_time = now.time()
 
         # 예방 윈도우 시작 및 종료 시간 파싱
-        prevent_start_hour, prevent_start_min = map(int, PREVENT_START_TIME.split(":"))
-        prevent_end_hour, prevent_end_min = map(int, PREVENT_END_TIME.split(":"))
-
-        prevent_start = time(prevent_start_hour, prevent_start_min)
-        prevent_end = time(prevent_end_hour, prevent_end_min)
+        prevent_start, prevent_end = _parse_prevent_window(PREVENT_START_TIME, PREVENT_END_TIME)
 
         # 자정을 넘어가는 경우 처리 (예: 23:00 ~ 04:00)
         if prevent_start > prevent_end:
@@ -326,6 +908,346 @@ def is_in_prevent_window(check_time: datetime = None) -> bool:
         return False
 
 
+def seconds_until_prevent_boundary(now: datetime = None) -> Optional[float]:
+    """
+    다음 예방 윈도우 경계(시작 또는 종료)까지 남은 시간(초)
+
+    Returns:
+        남은 초, 예방 윈도우가 설정되지 않았거나 형식이 잘못된 경우 None
+    """
+    if not PREVENT_START_TIME or not PREVENT_END_TIME:
+        return None
+
+    try:
+        boundaries = _parse_prevent_window(PREVENT_START_TIME, PREVENT_END_TIME)
+    except (ValueError, AttributeError):
+        return None
+
+    now = now or datetime.now()
+    remaining = []
+    for boundary in boundaries:
+        candidate = now.replace(hour=boundary.hour, minute=boundary.minute, second=0, microsecond=0)
+        if candidate <= now:
+            candidate += timedelta(days=1)
+        remaining.append((candidate - now).total_seconds())
+    return min(remaining)
+
+
+class StatusCache:
+    """
+    상태 엔드포인트 응답을 직렬화된 형태로 보관하는 캐시
+
+    스케줄러 이벤트(작업 실행/변경 등)가 발생하면 invalidate()로 비우고,
+    각 항목은 빌더가 알려준 만료 시점(예: 예방 윈도우 경계)까지만 유효합니다.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[bytes, str, float]] = {}
+
+    def get(self, key: str, builder: Callable[[], Tuple[dict, Optional[float]]]) -> Tuple[bytes, str]:
+        entry = self.entries.get(key)
+        if entry and monotonic() < entry[2]:
+            return entry[0], entry[1]
+
+        payload, ttl = builder()
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        expires_at = monotonic() + ttl if ttl is not None else float("inf")
+        self.entries[key] = (body, etag, expires_at)
+        return body, etag
+
+    def invalidate(self):
+        self.entries.clear()
+
+
+status_cache = StatusCache()
+
+
+class LoopLagMonitor:
+    """
+    이벤트 루프 지연 모니터
+
+    하트비트 태스크가 LOOP_LAG_INTERVAL_MS마다 깨어나 예정 시각 대비 지연을 히스토그램에 기록하고,
+    감시 스레드는 하트비트가 LOOP_LAG_THRESHOLD_MS 이상 멈추면 그 순간 루프 스레드의 스택을 캡처합니다.
+    (asyncio 디버그 모드의 slow callback 경고와 비슷하지만 운영 환경에서 상시 사용 가능한 비용)
+    """
+
+    def __init__(self, interval_ms: int = LOOP_LAG_INTERVAL_MS, threshold_ms: int = LOOP_LAG_THRESHOLD_MS):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.buckets = [0] * (len(LOOP_LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.stalls = deque(maxlen=20)
+        self._last_beat = monotonic()
+        self._captured_stack: Optional[str] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watchdog, name="loop-lag-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self._last_beat = monotonic()
+            self._observe(lag_ms)
+
+    def _observe(self, lag_ms: float):
+        # 감시 스레드가 캡처한 스택은 이번 하트비트에만 해당하므로 매번 비움
+        # (임계값 바로 아래의 지연에서 캡처된 스택이 다음 정지에 붙지 않도록)
+        stack, self._captured_stack = self._captured_stack, None
+        self.samples += 1
+        self.total_lag_ms += lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        for i, bound in enumerate(LOOP_LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+        if lag_ms >= self.threshold * 1000:
+            self.stalls.append({
+                "timestamp": str(datetime.now()),
+                "lag_ms": round(lag_ms, 1),
+                "stack": stack,
+            })
+            print(f"[{datetime.now()}] LOOP STALL: event loop blocked for {lag_ms:.0f}ms")
+            if stack:
+                print(stack.rstrip())
+
+    def _watchdog(self):
+        """하트비트가 멈춘 동안 루프 스레드의 현재 스택을 한 번 캡처"""
+        captured_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            if beat == captured_beat or monotonic() - beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._captured_stack = "".join(traceback.format_stack(frame, limit=15))
+                captured_beat = beat
+
+    def summary(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LOOP_LAG_BUCKETS_MS] + [f">{LOOP_LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            "enabled": self._task is not None and not self._task.done(),
+            "interval_ms": int(self.interval * 1000),
+            "threshold_ms": int(self.threshold * 1000),
+            "samples": self.samples,
+            "mean_lag_ms": round(self.total_lag_ms / self.samples, 2) if self.samples else 0.0,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "histogram": dict(zip(labels, self.buckets)),
+            "stalls": list(self.stalls),
+        }
+
+
+loop_monitor = LoopLagMonitor()
+
+
+def read_rss_bytes() -> Optional[int]:
+    """현재 RSS(바이트). /proc이 없으면 최대 RSS로 대체, 둘 다 없으면 None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def count_open_fds() -> Optional[int]:
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(fd_dir))
+        except OSError:
+            continue
+    return None
+
+
+def count_child_processes() -> Optional[int]:
+    """직계 하위 프로세스 수 (/proc의 children 목록, 없으면 pgrep 사용)"""
+    try:
+        count = 0
+        for tid in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{tid}/children", "r") as f:
+                count += len(f.read().split())
+        return count
+    except OSError:
+        pass
+
+    try:
+        result = subprocess.run(
+            ["pgrep", "-P", str(os.getpid())],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        return len(result.stdout.split())
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        # pgrep 명령어가 없는 시스템 (Windows 등)
+        return None
+
+
+class ResourceMonitor:
+    """
+    프로세스 리소스 사용량을 주기적으로 샘플링해 링 버퍼에 보관하고,
+    요청 시 tracemalloc 스냅샷을 기준 스냅샷과 비교해 증가량이 큰 할당 위치를 보고합니다.
+    """
+
+    def __init__(self, interval: int = RESOURCE_SAMPLE_SECONDS, history_size: int = RESOURCE_HISTORY_SIZE):
+        self.interval = interval
+        self.samples = deque(maxlen=history_size)
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_taken_at: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            try:
+                self.samples.append(await self.sample())
+            except Exception as e:
+                print(f"[{datetime.now()}] Warning: Resource sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sample(self) -> dict:
+        # /proc 읽기와 pgrep은 스레드에서 수행 (태스크 수는 루프 스레드에서만 셀 수 있음)
+        rss, fds, children = await asyncio.to_thread(
+            lambda: (read_rss_bytes(), count_open_fds(), count_child_processes())
+        )
+        return {
+            "timestamp": str(datetime.now()),
+            "rss_bytes": rss,
+            "open_fds": fds,
+            "child_processes": children,
+            "asyncio_tasks": len(asyncio.all_tasks()),
+            "threads": threading.active_count(),
+            "in_flight_greetings": len(in_flight_greetings),
+        }
+
+    def summary(self, current: dict, limit: int) -> dict:
+        samples = list(self.samples)
+        growth = {}
+        if samples:
+            first = samples[0]
+            for field in ("rss_bytes", "open_fds", "child_processes", "asyncio_tasks"):
+                if first[field] is not None and current[field] is not None:
+                    growth[field] = current[field] - first[field]
+        return {
+            "current": current,
+            "interval_seconds": self.interval,
+            "growth_since_first_sample": {"since": samples[0]["timestamp"], **growth} if samples else {},
+            "samples": samples[-limit:] if limit > 0 else [],
+            "tracemalloc": self.tracemalloc_status(),
+        }
+
+    def tracemalloc_status(self) -> dict:
+        status = {"tracing": tracemalloc.is_tracing(), "baseline_taken_at": self.baseline_taken_at}
+        if tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            status.update({"traced_bytes": traced, "peak_traced_bytes": peak})
+        return status
+
+    async def start_tracing(self, frames: int):
+        """tracemalloc 시작 (이미 실행 중이면 유지) 후 기준 스냅샷 생성"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        # 힙이 크면 스냅샷에 시간이 걸리므로 스레드에서 수행 (루프 정지 방지)
+        self.baseline = await asyncio.to_thread(self._snapshot)
+        self.baseline_taken_at = str(datetime.now())
+
+    def stop_tracing(self):
+        tracemalloc.stop()
+        self.baseline = None
+        self.baseline_taken_at = None
+
+    async def diff(self, top: int, reset: bool) -> dict:
+        """현재 스냅샷과 기준 스냅샷을 비교해 증가량 상위 할당 위치 반환"""
+        baseline, compared_to = self.baseline, self.baseline_taken_at
+
+        def take_and_compare():
+            snapshot = self._snapshot()
+            return snapshot, snapshot.compare_to(baseline, "lineno")
+
+        # 스냅샷과 비교 모두 스레드에서 수행 (루프 정지 방지)
+        snapshot, stats = await asyncio.to_thread(take_and_compare)
+        if reset:
+            # 다음 비교는 이번 스냅샷 이후의 증가량만 보여줌
+            self.baseline = snapshot
+            self.baseline_taken_at = str(datetime.now())
+
+        return {
+            "compared_to": compared_to,
+            "top_growth": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in stats[:top]
+            ],
+            **self.tracemalloc_status(),
+        }
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+
+resource_monitor = ResourceMonitor()
+
+
+def invalidate_status_cache(event=None):
+    """상태 응답 캐시 무효화 (스케줄러 이벤트 리스너 겸용, 설정 변경 시 직접 호출)"""
+    status_cache.invalidate()
+
+
+def cached_json_response(request: Request, key: str,
+                         builder: Callable[[], Tuple[dict, Optional[float]]]) -> Response:
+    """캐시된 JSON 응답 반환 (If-None-Match가 일치하면 304)"""
+    body, etag = status_cache.get(key, builder)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*"
+                          or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 def job_executed_listener(event):
     """스케줄러 작업 완료 이벤트 리스너"""
     job = scheduler.get_job(event.job_id)
@@ -348,9 +1270,115 @@ def job_error_listener(event):
     print("=" * 60)
 
 
+def _mark_draining() -> bool:
+    """드레인 플래그 설정 (이미 드레인 중이면 False)"""
+    global draining, drain_deadline
+    if draining:
+        return False
+    draining = True
+    drain_deadline = monotonic() + SHUTDOWN_GRACE_SECONDS
+    return True
+
+
+def _pause_for_drain():
+    drain_started.set()
+    if scheduler.running:
+        scheduler.pause()
+    print(f"[{datetime.now()}] Draining: no new greetings will be started "
+          f"({len(in_flight_greetings)} in flight, grace {SHUTDOWN_GRACE_SECONDS}s)")
+
+
+def begin_drain():
+    """드레인 시작: 새 인사를 받지 않고 준비 상태를 해제 (이벤트 루프에서 호출, 여러 번 호출해도 안전)"""
+    if _mark_draining():
+        _pause_for_drain()
+
+
+def request_drain():
+    """
+    신호 처리기용 드레인 시작
+
+    신호 처리기 안에서 print()나 스케줄러 조작을 하면 중단된 stdout 쓰기와 겹쳐
+    재진입 오류가 날 수 있으므로, 플래그만 설정하고 나머지는 이벤트 루프에서 실행합니다.
+    """
+    if _mark_draining() and event_loop is not None:
+        event_loop.call_soon_threadsafe(_pause_for_drain)
+
+
+async def wait_for_takeover(pid: int):
+    """
+    재시작 중 이전 인스턴스가 종료될 때까지 기다렸다가 스케줄러 재개
+
+    두 인스턴스가 동시에 인사를 보내지 않도록 새 인스턴스는 일시 정지 상태로 시작합니다.
+    이전 인스턴스는 최대 SHUTDOWN_GRACE_SECONDS 동안 드레인하므로 그보다 조금 더 기다립니다.
+    """
+    deadline = monotonic() + SHUTDOWN_GRACE_SECONDS + 60
+    while monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        except PermissionError:
+            pass
+        await asyncio.sleep(1)
+    else:
+        print(f"[{datetime.now()}] Warning: Previous instance {pid} is still running, resuming scheduler anyway")
+
+    if scheduler.running and not draining:
+        scheduler.resume()
+        print(f"[{datetime.now()}] Takeover complete: scheduler resumed. "
+              f"Next run: {scheduler.get_job('greet_agent_job').next_run_time}")
+
+
+async def drain_greetings():
+    """진행 중인 인사가 끝나길 기다리고, 기한을 넘기면 취소 후 하위 프로세스 정리"""
+    pending = {task for task in in_flight_greetings if not task.done()}
+    if not pending:
+        return
+
+    remaining = max(0.0, drain_deadline - monotonic()) if drain_deadline else SHUTDOWN_GRACE_SECONDS
+    print(f"[{datetime.now()}] Waiting up to {remaining:.0f}s for {len(pending)} in-flight greeting(s)...")
+    _, pending = await asyncio.wait(pending, timeout=remaining)
+    if not pending:
+        print(f"[{datetime.now()}] All in-flight greetings finished")
+        return
+
+    print(f"[{datetime.now()}] Grace period exceeded: cancelling {len(pending)} greeting(s)")
+    for task in pending:
+        task.cancel()
+    await asyncio.wait(pending, timeout=5)
+    reap_child_processes()
+
+
+def reap_child_processes():
+    """취소된 쿼리가 남긴 claude-code CLI 하위 프로세스 종료"""
+    try:
+        result = subprocess.run(
+            ["pgrep", "-P", str(os.getpid())],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        # pgrep 명령어가 없는 시스템 (Windows 등)
+        return
+
+    for pid in result.stdout.split():
+        try:
+            os.kill(int(pid), signal.SIGTERM)
+            print(f"[{datetime.now()}] Terminated child process {pid}")
+        except (ProcessLookupError, ValueError):
+            pass
+        except OSError as e:
+            print(f"[{datetime.now()}] Warning: Could not terminate child process {pid}: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage scheduler lifecycle"""
+    global event_loop
+    event_loop = asyncio.get_running_loop()
+    takeover_task = None
     try:
         # Calculate first run time
         next_run = calculate_next_run_time()
@@ -359,26 +1387,103 @@ async def lifespan(app: FastAPI):
         # Schedule task to run every 5 hours starting from calculated time
         scheduler.add_job(
             greet_agent,
-            trigger=IntervalTrigger(hours=5, start_date=next_run),
+            trigger=build_interval_trigger(next_run),
             id="greet_agent_job",
             name="Greet Claude Agent",
-            replace_existing=True
+            replace_existing=True,
+            # 재시작 인계 중 일시 정지된 동안 도래한 실행은 재개 후 한 번 실행
+            misfire_grace_time=SHUTDOWN_GRACE_SECONDS + 60
         )
-        
-        scheduler.start()
+
+        scheduler.start(paused=TAKEOVER_PID is not None)
+        if TAKEOVER_PID:
+            print(f"Scheduler paused until previous instance (PID {TAKEOVER_PID}) exits")
+            takeover_task = asyncio.create_task(wait_for_takeover(TAKEOVER_PID))
 
         # 이벤트 리스너 등록
         scheduler.add_listener(job_executed_listener, EVENT_JOB_EXECUTED)
         scheduler.add_listener(job_error_listener, EVENT_JOB_ERROR)
+        scheduler.add_listener(
+            invalidate_status_cache,
+            EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+            | EVENT_JOB_MODIFIED | EVENT_JOB_ADDED | EVENT_JOB_REMOVED
+        )
+        invalidate_status_cache()
 
         print(f"Scheduler started. Next run: {scheduler.get_job('greet_agent_job').next_run_time}")
         print("Event listeners registered for job monitoring")
 
+        if LOOP_MONITOR_ENABLED:
+            loop_monitor.start()
+            print(f"Loop lag monitor started (threshold {LOOP_LAG_THRESHOLD_MS}ms)")
+
+        resource_monitor.start()
+
         yield
         
     finally:
-        scheduler.shutdown()
+        if takeover_task:
+            takeover_task.cancel()
+        begin_drain()
+        await drain_greetings()
+        loop_monitor.stop()
+        resource_monitor.stop()
+        scheduler.shutdown(wait=False)
+        await usage_store.flush_async()
         print("Scheduler stopped")
+        sys.stdout.flush()
+
+
+def resolve_server_profile() -> dict:
+    """
+    적용될 uvicorn 설정 계산
+
+    performance 프로파일은 uvloop/httptools가 설치되어 있으면 사용하고,
+    default 프로파일은 기존과 같이 uvicorn의 자동 선택("auto")을 따릅니다.
+    """
+    has_uvloop = importlib.util.find_spec("uvloop") is not None and sys.platform != "win32"
+    has_httptools = importlib.util.find_spec("httptools") is not None
+
+    if _PERFORMANCE:
+        loop = "uvloop" if has_uvloop else "asyncio"
+        http = "httptools" if has_httptools else "h11"
+    else:
+        loop = "auto"
+        http = "auto"
+
+    return {
+        "name": SERVER_PROFILE,
+        "loop": loop,
+        "loop_effective": "uvloop" if loop == "uvloop" or (loop == "auto" and has_uvloop) else "asyncio",
+        "http": http,
+        "http_effective": "httptools" if http == "httptools" or (http == "auto" and has_httptools) else "h11",
+        "bind": f"unix:{UDS}" if UDS else f"{HOST}:{PORT}",
+        "keepalive_timeout": KEEPALIVE_TIMEOUT,
+        "backlog": BACKLOG,
+        "limit_concurrency": LIMIT_CONCURRENCY,
+        "access_log_sample_rate": ACCESS_LOG_SAMPLE_RATE,
+        "reuse_port": REUSE_PORT and not UDS and hasattr(socket, "SO_REUSEPORT"),
+    }
+
+
+SERVER_PROFILE_INFO = resolve_server_profile()
+
+
+class AccessLogSampler(logging.Filter):
+    """uvicorn 접근 로그를 지정한 비율만 남기는 필터"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return random.random() < self.rate
+
+
+# 프로브 응답은 내용이 고정되어 있으므로 미리 생성
+LIVEZ_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
+READY_RESPONSE = Response(content=b'{"status":"ready","pid":%d}' % os.getpid(), media_type="application/json")
+NOT_READY_RESPONSE = Response(content=b'{"status":"not ready"}', status_code=503, media_type="application/json")
 
 
 # Initialize FastAPI with lifespan
@@ -389,16 +1494,16 @@ app = FastAPI(
 )
 
 
-@app.get("/")
-async def root():
-    """Health check endpoint"""
+def build_status() -> Tuple[dict, Optional[float]]:
+    """헬스 체크 응답 생성 (예방 윈도우 경계까지 유효)"""
     next_run = scheduler.get_job('greet_agent_job')
     response = {
         "status": "running",
         "message": "Claude Agent Greeter is active",
         "next_scheduled_run": str(next_run.next_run_time) if next_run else "Not scheduled",
         "interval": "Every 5 hours",
-        "start_time": START_TIME
+        "start_time": START_TIME,
+        "server_profile": SERVER_PROFILE_INFO
     }
 
     # 예방 윈도우가 설정된 경우 추가
@@ -409,31 +1514,113 @@ async def root():
             "active": is_in_prevent_window()
         }
 
-    return response
-
-
-@app.post("/greet")
-async def manual_greet():
-    """Manually trigger a greeting (doesn't affect schedule)"""
-    result = await greet_agent()
-    return result
+    return response, seconds_until_prevent_boundary()
 
 
-@app.get("/schedule")
-async def get_schedule():
-    """Get current schedule information"""
+def build_schedule() -> Tuple[dict, Optional[float]]:
+    """스케줄 정보 응답 생성 (스케줄러 이벤트 발생 시까지 유효)"""
     job = scheduler.get_job('greet_agent_job')
     if not job:
         raise HTTPException(status_code=404, detail="Schedule not found")
-    
+
     return {
         "job_id": job.id,
         "job_name": job.name,
         "next_run_time": str(job.next_run_time),
         "trigger": str(job.trigger),
         "interval_hours": 5,
-        "start_time_config": START_TIME
-    }
+        "start_time_config": START_TIME,
+        "stagger": {
+            "window_minutes": STAGGER_WINDOW_MINUTES,
+            "key": STAGGER_KEY,
+            "offset_seconds": STAGGER_OFFSET_SECONDS,
+            "offset": str(timedelta(seconds=STAGGER_OFFSET_SECONDS)),
+            "jitter_seconds": JITTER_SECONDS
+        }
+    }, None
+
+
+@app.get("/")
+async def root(request: Request):
+    """Health check endpoint"""
+    return cached_json_response(request, "/", build_status)
+
+
+@app.get("/livez")
+async def livez():
+    """Liveness probe (process and event loop are responsive)"""
+    return LIVEZ_RESPONSE
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe (scheduler is running and not draining)"""
+    if scheduler.running and not draining:
+        return READY_RESPONSE
+    return NOT_READY_RESPONSE
+
+
+@app.post("/greet")
+async def manual_greet():
+    """Manually trigger a greeting (doesn't affect schedule)"""
+    if draining:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+
+    greeting = asyncio.create_task(greet_agent("manual"))
+    try:
+        return await greeting
+    except asyncio.CancelledError:
+        if greeting.cancelled() and draining:
+            raise HTTPException(status_code=503, detail="Greeting cancelled during shutdown")
+        raise
+
+
+@app.get("/schedule")
+async def get_schedule(request: Request):
+    """Get current schedule information"""
+    return cached_json_response(request, "/schedule", build_schedule)
+
+
+@app.get("/debug/loop")
+async def get_loop_lag():
+    """Event loop lag histogram and recent stalls with captured stacks"""
+    return loop_monitor.summary()
+
+
+@app.get("/debug/resources")
+async def get_resources(limit: int = 60):
+    """Current resource usage, recent samples and tracemalloc status"""
+    return resource_monitor.summary(await resource_monitor.sample(), limit)
+
+
+@app.post("/debug/resources/tracemalloc/start")
+async def start_tracemalloc(frames: int = 1):
+    """Start tracemalloc (if needed) and take a baseline snapshot"""
+    if frames < 1:
+        raise HTTPException(status_code=400, detail="frames must be at least 1")
+    await resource_monitor.start_tracing(frames)
+    return resource_monitor.tracemalloc_status()
+
+
+@app.get("/debug/resources/tracemalloc")
+async def diff_tracemalloc(top: int = 10, reset: bool = False):
+    """Top allocation sites by growth since the baseline snapshot"""
+    if not tracemalloc.is_tracing() or resource_monitor.baseline is None:
+        raise HTTPException(status_code=409, detail="tracemalloc is not running; POST /debug/resources/tracemalloc/start first")
+    return await resource_monitor.diff(top, reset)
+
+
+@app.post("/debug/resources/tracemalloc/stop")
+async def stop_tracemalloc():
+    """Stop tracemalloc and drop the baseline snapshot"""
+    resource_monitor.stop_tracing()
+    return resource_monitor.tracemalloc_status()
+
+
+@app.get("/usage")
+async def get_usage(days: int = 7):
+    """Token, latency and cost totals per job and per day"""
+    return usage_store.summary(days)
 
 
 if __name__ == "__main__":
@@ -445,6 +1632,9 @@ if __name__ == "__main__":
     print(f"Start time: {START_TIME}")
     print(f"Interval: Every 5 hours")
     print(f"Timezone: {TIMEZONE or 'System default'}")
+    if STAGGER_WINDOW_MINUTES or JITTER_SECONDS:
+        print(f"Stagger: +{timedelta(seconds=STAGGER_OFFSET_SECONDS)} "
+              f"(window {STAGGER_WINDOW_MINUTES}m, key '{STAGGER_KEY}'), jitter up to {JITTER_SECONDS}s")
 
     # 예방 윈도우가 설정된 경우 출력
     if PREVENT_START_TIME and PREVENT_END_TIME:
@@ -453,6 +1643,46 @@ if __name__ == "__main__":
     else:
         print("Prevent window: Not configured")
 
+    print(f"Shutdown grace period: {SHUTDOWN_GRACE_SECONDS}s")
+    profile = SERVER_PROFILE_INFO
+    print(f"Server profile: {profile['name']} (loop={profile['loop_effective']}, http={profile['http_effective']}, "
+          f"bind={profile['bind']}, keep-alive={KEEPALIVE_TIMEOUT}s, access log sample={ACCESS_LOG_SAMPLE_RATE:g})")
     print("=" * 60)
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    class GreeterServer(uvicorn.Server):
+        """종료 신호를 받는 즉시 드레인을 시작하는 uvicorn 서버"""
+
+        def handle_exit(self, sig, frame):
+            request_drain()
+            super().handle_exit(sig, frame)
+
+    sockets = None
+    if profile["reuse_port"]:
+        # 새 인스턴스가 같은 포트에 먼저 바인드한 뒤 이전 인스턴스를 종료할 수 있도록 함
+        family = socket.AF_INET6 if ":" in HOST else socket.AF_INET
+        listen_socket = socket.socket(family, socket.SOCK_STREAM)
+        listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        listen_socket.bind((HOST, PORT))
+        sockets = [listen_socket]
+        print("SO_REUSEPORT enabled (zero-downtime restart supported)")
+    elif REUSE_PORT and UDS:
+        print("REUSE_PORT ignored: not supported with UDS")
+
+    config = uvicorn.Config(
+        app,
+        host=HOST,
+        port=PORT,
+        uds=UDS,
+        loop=profile["loop"],
+        http=profile["http"],
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        backlog=BACKLOG,
+        limit_concurrency=LIMIT_CONCURRENCY,
+        access_log=ACCESS_LOG_SAMPLE_RATE > 0,
+        timeout_graceful_shutdown=SHUTDOWN_GRACE_SECONDS
+    )
+    if 0 < ACCESS_LOG_SAMPLE_RATE < 1:
+        logging.getLogger("uvicorn.access").addFilter(AccessLogSampler(ACCESS_LOG_SAMPLE_RATE))
+
+    GreeterServer(config).run(sockets=sockets)
@@ -0,0 +1,104 @@
+#!/bin/bash
+
+# Claude Greeter - Zero-Downtime Restart Script (Mac/Linux)
+# Starts a new instance on the same port (SO_REUSEPORT), waits until it is
+# ready, then gracefully drains and stops the old instance.
+# Requires REUSE_PORT=true in .env for both the old and the new instance,
+# unless the server listens on a unix socket (UDS=...), whose path the new
+# instance takes over when it binds.
+#
+# The new instance keeps its scheduler paused until the old one has exited,
+# so only one of them sends scheduled greetings during the overlap.
+# Caveat: when the old instance closes its listener, Linux resets any
+# connections still waiting in that listener's accept queue. A few clients
+# that connected just before the switch may see a reset and must retry.
+
+set -e
+
+echo "========================================"
+echo "Claude Greeter - Restart Script"
+echo "========================================"
+echo ""
+
+# Color codes
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+# Get script directory
+SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+cd "$SCRIPT_DIR"
+
+# API address (UDS or PORT in .env, default port 8000)
+read_env() {
+    grep -E "^$1=" .env 2>/dev/null | tail -n 1 | cut -d= -f2- | sed 's/#.*//' | tr -d "[:space:]\"'"
+}
+API_PORT=$(read_env PORT)
+API_PORT=${API_PORT:-8000}
+API_UDS=$(read_env UDS)
+if [ -n "$API_UDS" ]; then
+    CURL_OPTS=(--unix-socket "$API_UDS")
+    API_URL="http://localhost"
+else
+    CURL_OPTS=()
+    API_URL="http://localhost:$API_PORT"
+fi
+
+# TCP needs SO_REUSEPORT on both instances; with UDS the new instance
+# simply takes over the socket path
+if [ -z "$API_UDS" ] && ! grep -qiE '^REUSE_PORT=(1|true|yes)' .env 2>/dev/null; then
+    echo -e "${RED}REUSE_PORT=true is not set in .env${NC}"
+    echo "Zero-downtime restart needs SO_REUSEPORT on both instances."
+    echo "Set REUSE_PORT=true, then run ./stop.sh and ./setup.sh once."
+    exit 1
+fi
+
+# Check the old instance
+if [ ! -f "app.pid" ] || ! ps -p $(cat app.pid) > /dev/null 2>&1; then
+    echo -e "${YELLOW}No running instance found. Use ./setup.sh to start.${NC}"
+    exit 1
+fi
+OLD_PID=$(cat app.pid)
+
+# Activate virtual environment if present
+if [ -f "venv/bin/activate" ]; then
+    source venv/bin/activate
+fi
+
+# Start the new instance alongside the old one
+echo -e "${YELLOW}Starting new instance (old PID: $OLD_PID)...${NC}"
+TAKEOVER_PID=$OLD_PID nohup python3 main.py >> log/app.log 2>&1 &
+NEW_PID=$!
+
+# Wait until the new instance reports ready (connections are spread across
+# both instances, so retry until one lands on the new PID)
+READY=0
+for i in $(seq 1 60); do
+    if ! ps -p $NEW_PID > /dev/null 2>&1; then
+        break
+    fi
+    if curl -s "${CURL_OPTS[@]}" "$API_URL/readyz" 2>/dev/null | grep -q "\"pid\":$NEW_PID"; then
+        READY=1
+        break
+    fi
+    sleep 0.5
+done
+
+if [ $READY -ne 1 ]; then
+    echo -e "${RED}✗ New instance did not become ready. Old instance left running.${NC}"
+    kill $NEW_PID > /dev/null 2>&1 || true
+    echo "Check log/app.log for errors"
+    exit 1
+fi
+
+echo -e "${GREEN}✓ New instance ready (PID: $NEW_PID)${NC}"
+echo $NEW_PID > app.pid
+
+# Drain and stop the old instance in the background
+echo -e "${YELLOW}Draining old instance (PID: $OLD_PID)...${NC}"
+kill $OLD_PID
+
+echo -e "${GREEN}✓ Restart complete${NC}"
+echo "  Old instance finishes in-flight greetings and exits on its own."
+echo "========================================"
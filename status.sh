@@ -14,6 +14,23 @@ NC='\033[0m'
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 cd "$SCRIPT_DIR"
 
+# API address (UDS or PORT in .env, default port 8000)
+read_env() {
+    grep -E "^$1=" .env 2>/dev/null | tail -n 1 | cut -d= -f2- | sed 's/#.*//' | tr -d "[:space:]\"'"
+}
+API_PORT=$(read_env PORT)
+API_PORT=${API_PORT:-8000}
+API_UDS=$(read_env UDS)
+if [ -n "$API_UDS" ]; then
+    CURL_OPTS=(--unix-socket "$API_UDS")
+    API_URL="http://localhost"
+    API_LABEL="unix:$API_UDS"
+else
+    CURL_OPTS=()
+    API_URL="http://localhost:$API_PORT"
+    API_LABEL="$API_URL"
+fi
+
 echo "========================================"
 echo "Claude Greeter - Status"
 echo "========================================"
@@ -55,9 +72,9 @@ echo ""
 # Check API endpoint
 echo "API Status:"
 if command -v curl &> /dev/null; then
-    API_RESPONSE=$(curl -s http://localhost:8000 2>/dev/null)
+    API_RESPONSE=$(curl -s "${CURL_OPTS[@]}" "$API_URL/" 2>/dev/null)
     if [ $? -eq 0 ]; then
-        echo -e "  ${GREEN}✓ API is responding at http://localhost:8000${NC}"
+        echo -e "  ${GREEN}✓ API is responding at $API_LABEL${NC}"
 
         # Parse and display key info if jq is available
         if command -v jq &> /dev/null; then
@@ -109,6 +126,6 @@ echo "========================================"
 echo "Useful Commands:"
 echo "  ./stop.sh              - Stop application"
 echo "  tail -f log/app.log    - Follow live logs"
-echo "  curl http://localhost:8000/schedule - Get schedule info"
-echo "  curl -X POST http://localhost:8000/greet - Manual trigger"
+echo "  curl ${CURL_OPTS[*]:+${CURL_OPTS[*]} }$API_URL/schedule - Get schedule info"
+echo "  curl ${CURL_OPTS[*]:+${CURL_OPTS[*]} }-X POST $API_URL/greet - Manual trigger"
 echo "========================================"
@@ -33,7 +33,8 @@ if %errorlevel% neq 0 (
 
 REM Stop the process
 echo Stopping application ^(PID: %APP_PID%^)...
-taskkill /PID %APP_PID% /F >nul 2>&1
+REM /T also terminates child claude-code CLI processes
+taskkill /PID %APP_PID% /T /F >nul 2>&1
 
 REM Wait a moment
 timeout /t 2 /nobreak >nul
@@ -36,22 +36,34 @@ if ! ps -p $APP_PID > /dev/null 2>&1; then
     exit 0
 fi
 
+# Shutdown grace period (in-flight greetings are drained for up to this long)
+read_env() {
+    grep -E "^$1=" .env 2>/dev/null | tail -n 1 | cut -d= -f2- | sed 's/#.*//' | tr -d "[:space:]\"'"
+}
+GRACE_SECONDS=$(read_env SHUTDOWN_GRACE_SECONDS)
+if ! [[ "$GRACE_SECONDS" =~ ^[0-9]+$ ]]; then
+    GRACE_SECONDS=75
+fi
+STOP_TIMEOUT=$((GRACE_SECONDS + 15))
+
 # Stop the process
 echo -e "${YELLOW}Stopping application (PID: $APP_PID)...${NC}"
+echo "Waiting up to ${STOP_TIMEOUT}s for in-flight greetings to finish"
 kill $APP_PID
 
-# Wait for process to stop (max 10 seconds)
+# Wait for process to stop (grace period + margin)
 COUNTER=0
-while ps -p $APP_PID > /dev/null 2>&1 && [ $COUNTER -lt 10 ]; do
+while ps -p $APP_PID > /dev/null 2>&1 && [ $COUNTER -lt $STOP_TIMEOUT ]; do
     sleep 1
     COUNTER=$((COUNTER + 1))
     echo -n "."
 done
 echo ""
 
-# Force kill if still running
+# Force kill if still running (including orphaned claude-code CLI children)
 if ps -p $APP_PID > /dev/null 2>&1; then
     echo -e "${YELLOW}Process did not stop gracefully. Forcing termination...${NC}"
+    pkill -9 -P $APP_PID > /dev/null 2>&1 || true
     kill -9 $APP_PID
     sleep 1
 fi
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+배치 체크포인트 테스트 스크립트
+완료 줄 비트맵, 오류 기록 재시도, 끊긴 마지막 기록 정리, 손상된 중간 기록 처리, 입력 파싱을 확인합니다.
+"""
+import io
+import os
+import sys
+import json
+import tempfile
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import CheckpointError, CompletedLines, iter_prompts, load_checkpoint
+
+
+def record(line: int, status: str = "success") -> str:
+    return json.dumps({"line": line, "id": None, "status": status}) + "\n"
+
+
+def run_tests():
+    """임시 출력 파일로 체크포인트 동작 검증"""
+    print("=" * 60)
+    print("배치 체크포인트 테스트")
+    print("=" * 60)
+
+    checks = []
+
+    # 비트맵
+    completed = CompletedLines()
+    for line in (1, 8, 9, 1000, 8):
+        completed.add(line)
+    checks.append(("중복 추가는 한 번만 셈", completed.count == 4))
+    checks.append(("추가한 줄만 포함", all(n in completed for n in (1, 8, 9, 1000))
+                   and not any(n in completed for n in (0, 2, 7, 999, 1001, 10 ** 6))))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.jsonl")
+
+        # 성공만 완료 처리, 끊긴 마지막 기록은 잘라냄
+        content = record(1) + record(2, "error") + record(3) + record(2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content + '{"line": 4, "id": null, "sta')
+        completed = load_checkpoint(path)
+        checks.append(("성공한 줄만 완료 (1, 2, 3)", completed.count == 3 and 2 in completed))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(record(1) + record(2, "error"))
+        checks.append(("오류만 있는 줄은 재시도 대상", 2 not in load_checkpoint(path)))
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content + '{"line": 4, "id": null, "sta')
+        load_checkpoint(path)
+        with open(path, "r", encoding="utf-8") as f:
+            checks.append(("끊긴 마지막 기록만 잘라냄", f.read() == content))
+
+        # 중간의 손상된 기록은 잘라내지 않고 오류
+        damaged = record(1) + "not json\n" + record(2) + record(3)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(damaged)
+        try:
+            load_checkpoint(path)
+            raised = False
+        except CheckpointError as e:
+            raised = ":2:" in str(e)
+        checks.append(("중간 손상 기록은 CheckpointError (2번째 줄)", raised))
+        with open(path, "r", encoding="utf-8") as f:
+            checks.append(("손상 시 파일은 그대로 유지", f.read() == damaged))
+
+        checks.append(("출력 파일이 없으면 빈 체크포인트",
+                       load_checkpoint(os.path.join(tmp, "missing.jsonl")).count == 0))
+
+    # 입력 파싱
+    stream = io.StringIO('{"id": "q1", "prompt": "Hello"}\n"quoted"\n\nplain text\n{"id": "q4", "prompt": ""}\n')
+    completed = CompletedLines()
+    completed.add(1)
+    prompts = list(iter_prompts(stream, completed))
+    checks.append(("완료 줄과 빈 줄/빈 프롬프트는 건너뜀",
+                   prompts == [(2, None, "quoted"), (4, None, "plain text")]))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
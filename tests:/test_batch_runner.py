@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+배치 실행 테스트 스크립트
+호출 간격 대기와 쿼리 시간의 분리 측정, 초과분 파일 경로 기록과 보존,
+--concurrency 검증을 가짜 쿼리로 확인합니다.
+"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+from functools import partial
+from types import SimpleNamespace
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+import batch
+
+QUERY_SECONDS = 0.2
+MIN_INTERVAL = 0.5
+RESPONSE = "Hello, batch world!"
+
+
+async def slow_query(prompt, options=None):
+    """QUERY_SECONDS 걸려 RESPONSE를 돌려주는 SDK 쿼리"""
+    await asyncio.sleep(QUERY_SECONDS)
+    yield SimpleNamespace(content=[SimpleNamespace(text=RESPONSE)])
+
+
+def run_tests():
+    """임시 입력/출력 파일로 batch.main_cli 검증"""
+    print("=" * 60)
+    print("배치 실행 테스트")
+    print("=" * 60)
+
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "prompts.jsonl")
+        output_path = os.path.join(tmp, "results.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write('"one"\n"two"\n"three"\n')
+
+        try:
+            batch.main_cli([input_path, "-o", output_path, "-c", "0"])
+            rejected = False
+        except SystemExit as e:
+            rejected = e.code == 2
+        checks.append(("--concurrency 0은 거부", rejected and not os.path.exists(output_path)))
+
+        main.RATE_LIMIT_FILE = os.path.join(tmp, "next_api_call")
+        main.usage_store = batch.usage_store = main.UsageStore(os.path.join(tmp, "usage.json"))
+        main.query = slow_query
+        # 모든 응답이 잘려 초과분 파일이 생기도록 작은 제한 사용
+        main.ResponseBuffer = partial(main.ResponseBuffer, max_bytes=8, spill=True)
+        main.RESPONSE_SPILL_MAX_FILES = 1
+
+        exit_code = batch.main_cli([input_path, "-o", output_path, "-c", "3", "--min-interval", str(MIN_INTERVAL)])
+        with open(output_path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        checks.append(("세 프롬프트 모두 성공", exit_code == 0 and len(records) == 3
+                       and all(r["status"] == "success" for r in records)))
+
+        # 동시 실행 3개가 0.5초 간격으로 호출되므로 대기는 약 0, 0.5, 1.0초
+        waits = sorted(r["wait_seconds"] for r in records)
+        checks.append(("호출 간격 대기는 wait_seconds로 기록",
+                       waits[0] < 0.1 and waits[-1] >= 2 * MIN_INTERVAL - 0.05))
+        checks.append(("elapsed_seconds는 대기를 제외한 쿼리 시간",
+                       all(QUERY_SECONDS - 0.05 <= r["elapsed_seconds"] < QUERY_SECONDS + 0.2 for r in records)))
+
+        spill_dir = output_path + ".responses"
+        spilled = [r.get("spill_file") for r in records]
+        checks.append(("기록에 배치 전용 초과분 파일 경로 포함",
+                       all(path and os.path.dirname(path) == spill_dir for path in spilled)))
+        checks.append(("초과분 파일은 정리되지 않음 (RESPONSE_SPILL_MAX_FILES=1이어도 3개 유지)",
+                       all(path and os.path.exists(path) for path in spilled)))
+        contents = []
+        for path in filter(None, spilled):
+            with open(path, "r", encoding="utf-8") as f:
+                contents.append(f.read())
+        checks.append(("초과분 파일에 전체 응답", contents == [RESPONSE] * 3))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+종료 드레인 테스트 스크립트
+신호 처리기용 드레인 요청, 유예 시간 내 대기, 기한 초과 시 취소, 드레인 중 /greet 거부,
+재시작 인계 후 스케줄러 재개를 가짜 작업으로 확인합니다.
+"""
+import os
+import sys
+import asyncio
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+from fastapi import HTTPException
+
+import main
+
+
+def reset_drain():
+    main.draining = False
+    main.drain_deadline = None
+    main.drain_started = asyncio.Event()
+
+
+async def hanging_query(prompt, options=None):
+    """응답하지 않는 SDK 쿼리"""
+    await asyncio.sleep(3600)
+    yield None
+
+
+async def noop():
+    pass
+
+
+async def run_scenarios(checks: list, tmp: str):
+    main.event_loop = asyncio.get_running_loop()
+    scheduler = main.scheduler
+    scheduler.add_job(main.greet_agent, trigger=main.build_interval_trigger(
+        datetime.now(scheduler.timezone) + timedelta(days=1)), id="greet_agent_job")
+
+    # 재시작 인계: 이전 인스턴스가 끝날 때까지 일시 정지 후 재개
+    scheduler.start(paused=True)
+    previous = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.5)"])
+    reaper = asyncio.create_task(asyncio.to_thread(previous.wait))
+    await asyncio.wait_for(main.wait_for_takeover(previous.pid), timeout=10)
+    await reaper
+    checks.append(("이전 인스턴스 종료 후 스케줄러 재개", scheduler.state == STATE_RUNNING))
+
+    # 신호 처리기용 드레인 요청: 플래그만 설정하고 정지는 이벤트 루프에서
+    main.request_drain()
+    checks.append(("request_drain은 플래그와 기한만 설정",
+                   main.draining and main.drain_deadline is not None and scheduler.state == STATE_RUNNING))
+    await asyncio.sleep(0)
+    checks.append(("스케줄러 정지는 이벤트 루프에서 실행",
+                   scheduler.state == STATE_PAUSED and main.drain_started.is_set()))
+
+    # 드레인 중 /greet 거부
+    try:
+        await main.manual_greet()
+        rejected = False
+    except HTTPException as e:
+        rejected = e.status_code == 503
+    checks.append(("드레인 중 POST /greet는 503", rejected))
+
+    # 유예 시간 안에 끝나는 인사는 기다림
+    reset_drain()
+    finishing = asyncio.create_task(asyncio.sleep(0.2))
+    main.in_flight_greetings.add(finishing)
+    main.begin_drain()
+    await main.drain_greetings()
+    main.in_flight_greetings.discard(finishing)
+    checks.append(("유예 시간 내 인사는 취소 없이 완료", finishing.done() and not finishing.cancelled()))
+
+    # 기한을 넘긴 인사는 취소되고 CANCELLED 기록과 cancelled 시도가 남음
+    reset_drain()
+    main.SHUTDOWN_GRACE_SECONDS = 0.3
+    greeting = asyncio.create_task(main.greet_agent("manual"))
+    await asyncio.sleep(0.1)
+    main.begin_drain()
+    await main.drain_greetings()
+    checks.append(("기한 초과 인사는 취소됨", greeting.cancelled()))
+    with open(os.path.join(tmp, f"{datetime.now().strftime('%Y-%m-%d')}.log"), "r", encoding="utf-8") as f:
+        checks.append(("일별 로그에 CANCELLED 기록", "CANCELLED: Greeting cancelled during shutdown" in f.read()))
+    recent = list(main.usage_store.recent)
+    checks.append(("사용량에 cancelled 시도 기록", recent and recent[-1]["status"] == "cancelled"))
+    checks.append(("취소된 인사는 in_flight_greetings에서 제거", not main.in_flight_greetings))
+
+    scheduler.shutdown(wait=False)
+
+
+def run_tests():
+    """임시 디렉터리와 가짜 쿼리로 드레인 동작 검증"""
+    print("=" * 60)
+    print("종료 드레인 테스트")
+    print("=" * 60)
+
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        main.LOG_DIR = tmp
+        main.RATE_LIMIT_FILE = os.path.join(tmp, "next_api_call")
+        main.MIN_CALL_INTERVAL = 0
+        main.usage_store = main.UsageStore(os.path.join(tmp, "usage.json"))
+        main.query = hanging_query
+        main.cleanup_stale_processes = noop
+        main.reap_child_processes = lambda: None
+        asyncio.run(run_scenarios(checks, tmp))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
@@ -82,14 +82,15 @@ async def test_retry_with_timeout():
         print("Claude에 'test' 메시지 전송 중...")
         start = datetime.now()
 
-        response = await query_claude_with_retry("Say 'test successful'", options)
+        result = await query_claude_with_retry("Say 'test successful'", options)
 
         elapsed = (datetime.now() - start).total_seconds()
 
-        print(f"응답: {response}")
+        print(f"응답: {result.text}")
+        print(f"응답 크기: {result.total_bytes} bytes (잘림: {result.truncated})")
         print(f"소요 시간: {elapsed:.1f}초")
 
-        if response:
+        if result.text:
             print("✓ Claude 쿼리 성공\n")
             return True
         else:
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+로그 분석 도구 테스트 스크립트
+샘플 일별 로그를 만들어 지연 백분위수, 일별 집계, 공백 계산, 히스토리 백필을 확인합니다.
+"""
+import os
+import sys
+import json
+import tempfile
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyze_logs import analyze, build_report
+
+SAMPLE_LOGS = {
+    "2025-10-28.log": (
+        "[2025-10-28 09:00:00.100000] Claude responded (took 2.0s): Hello!\n"
+        "[2025-10-28 14:00:00.100000] Claude responded (took 4.0s): Hi there,\n"
+        "how can I help?\n"
+        "[2025-10-28 19:00:00.100000] Error greeting agent: Timeout after 60s (all 3 attempts failed)\n"
+        "Traceback (most recent call last):\n"
+        "  File \"main.py\", line 1, in greet_agent\n"
+        "Exception: Timeout after 60s\n"
+        "\n"
+        "[2025-10-28 23:30:00.100000] SKIPPED: Job execution prevented during quiet hours (23:00 - 04:00). "
+        "Original next run: 2025-10-29 04:30:00.\n"
+        "[2025-10-28 23:30:00.200000] RESCHEDULED: Job reset to start at the next START_TIME. "
+        "New next run: 2025-10-29 09:00:00\n"
+    ),
+    "2025-10-29.log": (
+        "[2025-10-29 09:00:00.100000] Claude responded (took 3.0s): Hello again!\n"
+        "[2025-10-29 14:00:00] Claude responded (took 1.0s): Hi!\n"
+        "[2025-10-29 15:00:00.100000] CANCELLED: Greeting cancelled during shutdown\n"
+    ),
+}
+
+
+def run_tests():
+    """샘플 로그로 분석 결과 검증"""
+    print("=" * 60)
+    print("로그 분석 도구 테스트")
+    print("=" * 60)
+
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, content in SAMPLE_LOGS.items():
+            path = os.path.join(tmp, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            paths.append(path)
+
+        history_path = os.path.join(tmp, "history.jsonl")
+        for jobs in (1, 2):
+            report = build_report(analyze(paths, jobs=jobs, backfill_path=history_path))
+            day1 = report["days"]["2025-10-28"]
+            day2 = report["days"]["2025-10-29"]
+            latency = report["latency_seconds"]
+
+            checks.append((f"[jobs={jobs}] 응답 4건 집계", latency["count"] == 4))
+            checks.append((f"[jobs={jobs}] 지연 p50 = 2.0s", latency["p50"] == 2.0))
+            checks.append((f"[jobs={jobs}] 지연 max = 4.0s", latency["max"] == 4.0))
+            checks.append((f"[jobs={jobs}] 10-28 성공 2 / 오류 1 / 스킵 1",
+                           (day1["success"], day1["error"], day1["skipped"]) == (2, 1, 1)))
+            checks.append((f"[jobs={jobs}] 10-28 리스케줄 1", day1["rescheduled"] == 1))
+            checks.append((f"[jobs={jobs}] 10-29 취소 1", day2["cancelled"] == 1))
+            checks.append((f"[jobs={jobs}] 최대 공백 = 10-28 14:00 -> 10-29 09:00 (19h)",
+                           report["largest_gaps"][0]["hours"] == 19.0))
+
+            with open(history_path, "r", encoding="utf-8") as f:
+                events = [json.loads(line) for line in f]
+            checks.append((f"[jobs={jobs}] 히스토리 이벤트 8건 (날짜 순)",
+                           len(events) == 8 and events[0]["timestamp"] < events[-1]["timestamp"]))
+            checks.append((f"[jobs={jobs}] 히스토리에 응답 시간 기록",
+                           events[0]["elapsed_seconds"] == 2.0 and events[0]["message"] == "Hello!"))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += ok
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+이벤트 루프 지연 모니터 테스트 스크립트
+지연 히스토그램 구간, 정지(stall) 기록과 스택 첨부, 실제 루프 정지 시 스택 캡처를 확인합니다.
+"""
+import os
+import sys
+import time
+import asyncio
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import LoopLagMonitor
+
+
+def block_event_loop(seconds: float):
+    """이벤트 루프를 막는 동기 작업"""
+    time.sleep(seconds)
+
+
+async def run_live(monitor: LoopLagMonitor):
+    monitor.start()
+    await asyncio.sleep(0.2)
+    block_event_loop(0.4)
+    await asyncio.sleep(0.2)
+    monitor.stop()
+
+
+def run_tests():
+    """_observe를 직접 호출하고, 실제 루프를 막아 모니터 동작 검증"""
+    print("=" * 60)
+    print("이벤트 루프 지연 모니터 테스트")
+    print("=" * 60)
+
+    checks = []
+
+    # 히스토그램 구간과 통계
+    monitor = LoopLagMonitor(interval_ms=100, threshold_ms=250)
+    for lag in (0.5, 3, 3, 40, 6000):
+        monitor._observe(lag)
+    summary = monitor.summary()
+    histogram = summary["histogram"]
+    checks.append(("0.5ms -> <=1ms", histogram["<=1ms"] == 1))
+    checks.append(("3ms -> <=5ms (2건)", histogram["<=5ms"] == 2))
+    checks.append(("40ms -> <=50ms", histogram["<=50ms"] == 1))
+    checks.append(("6000ms -> >5000ms", histogram[">5000ms"] == 1))
+    checks.append(("표본 수/최대/평균", summary["samples"] == 5 and summary["max_lag_ms"] == 6000.0
+                   and summary["mean_lag_ms"] == round(6046.5 / 5, 2)))
+    checks.append(("임계값 이상만 정지로 기록", len(summary["stalls"]) == 1 and summary["stalls"][0]["lag_ms"] == 6000.0))
+
+    # 캡처된 스택은 해당 하트비트의 정지에만 첨부
+    monitor = LoopLagMonitor(interval_ms=100, threshold_ms=250)
+    monitor._captured_stack = "stack A"
+    monitor._observe(300)
+    checks.append(("정지에 캡처된 스택 첨부", monitor.stalls[-1]["stack"] == "stack A"))
+    monitor._captured_stack = "stack B"
+    monitor._observe(240)
+    monitor._observe(500)
+    checks.append(("임계값 아래 하트비트에서 캡처된 스택은 다음 정지에 붙지 않음",
+                   len(monitor.stalls) == 2 and monitor.stalls[-1]["stack"] is None))
+
+    # 실제 루프 정지: 감시 스레드가 막고 있는 함수의 스택을 캡처
+    monitor = LoopLagMonitor(interval_ms=20, threshold_ms=150)
+    asyncio.run(run_live(monitor))
+    stalls = monitor.summary()["stalls"]
+    checks.append(("실제 정지(400ms) 감지", len(stalls) >= 1 and stalls[0]["lag_ms"] >= 300))
+    checks.append(("캡처된 스택에 막고 있는 함수 포함",
+                   bool(stalls) and "block_event_loop" in (stalls[0]["stack"] or "")))
+    checks.append(("stop() 후 비활성", not monitor.summary()["enabled"]))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
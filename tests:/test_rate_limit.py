@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+공유 호출 간격 테스트 스크립트
+간격이 짧은 다른 프로세스가 계속 호출하는 동안에도 간격이 긴 프로세스가 슬롯을 받고,
+각 호출 뒤에는 호출한 프로세스의 간격이 지켜지는지 두 프로세스로 확인합니다.
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import subprocess
+
+# 프로젝트 루트를 path에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main
+
+FAST_INTERVAL = 0.2
+SLOW_INTERVAL = 1.0
+SLACK = 0.02  # 타임스탬프 기록 지연 허용치
+
+# 짧은 간격으로 계속 호출하는 다른 프로세스 (배치 실행 역할)
+FAST_CALLER = """
+import sys, time, asyncio
+sys.path.insert(0, sys.argv[1])
+import main
+main.RATE_LIMIT_FILE = sys.argv[2]
+main.MIN_CALL_INTERVAL = float(sys.argv[3])
+
+async def run(until):
+    while time.time() < until:
+        await main.enforce_rate_limit()
+        print("CALL", time.time(), flush=True)
+
+asyncio.run(run(time.time() + float(sys.argv[4])))
+"""
+
+
+async def slow_calls(count: int) -> list:
+    """(요청 시각, 호출 시각) 목록"""
+    calls = []
+    for _ in range(count):
+        requested = time.time()
+        await main.enforce_rate_limit()
+        calls.append((requested, time.time()))
+    return calls
+
+
+def run_tests():
+    """빠른 호출자 프로세스와 느린 호출자(이 프로세스)로 슬롯 예약 검증"""
+    print("=" * 60)
+    print("공유 호출 간격 테스트")
+    print("=" * 60)
+
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        main.RATE_LIMIT_FILE = os.path.join(tmp, "next_api_call")
+        main.MIN_CALL_INTERVAL = SLOW_INTERVAL
+
+        fast = subprocess.Popen(
+            [sys.executable, "-c", FAST_CALLER, ROOT, main.RATE_LIMIT_FILE, str(FAST_INTERVAL), "6"],
+            cwd=tmp, stdout=subprocess.PIPE, text=True,
+        )
+        # 빠른 호출자가 간격 파일을 쓰기 시작할 때까지 대기
+        deadline = time.time() + 30
+        while not os.path.exists(main.RATE_LIMIT_FILE) and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)
+
+        try:
+            slow = asyncio.run(asyncio.wait_for(slow_calls(3), timeout=10))
+        except asyncio.TimeoutError:
+            slow = []
+        output, _ = fast.communicate(timeout=30)
+        fast_times = [float(line.split()[1]) for line in output.splitlines() if line.startswith("CALL ")]
+
+    checks.append(("느린 호출자가 빠른 호출자 사이에서 3번 모두 호출", len(slow) == 3))
+    checks.append(("느린 호출자의 대기는 자기 간격 + 빠른 간격 이내",
+                   bool(slow) and all(called - requested <= SLOW_INTERVAL + FAST_INTERVAL + 0.15
+                                      for requested, called in slow)))
+    checks.append(("빠른 호출자도 계속 호출 (10번 이상)", len(fast_times) >= 10))
+
+    timeline = sorted([(t, SLOW_INTERVAL) for _, t in slow] + [(t, FAST_INTERVAL) for t in fast_times])
+    gaps = list(zip(timeline, timeline[1:]))
+    checks.append(("느린 호출 뒤 다음 호출까지 1.0초 이상",
+                   all(b[0] - a[0] >= SLOW_INTERVAL - SLACK for a, b in gaps if a[1] == SLOW_INTERVAL)))
+    checks.append(("빠른 호출 뒤 다음 호출까지 0.2초 이상",
+                   all(b[0] - a[0] >= FAST_INTERVAL - SLACK for a, b in gaps if a[1] == FAST_INTERVAL)))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
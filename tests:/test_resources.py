@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+리소스 모니터 테스트 스크립트
+샘플 기반 증가량 요약, 현재 샘플 수집, tracemalloc 엔드포인트(400/409, 비교, 중지)를 확인합니다.
+"""
+import os
+import sys
+import asyncio
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+import main
+from main import ResourceMonitor
+
+SAMPLE_FIELDS = ("rss_bytes", "open_fds", "child_processes", "asyncio_tasks")
+
+
+def make_sample(timestamp: str, rss, fds, children, tasks) -> dict:
+    return {"timestamp": timestamp, **dict(zip(SAMPLE_FIELDS, (rss, fds, children, tasks)))}
+
+
+async def expect_status(coro, status_code: int) -> bool:
+    try:
+        await coro
+    except HTTPException as e:
+        return e.status_code == status_code
+    return False
+
+
+async def run_endpoints(checks: list):
+    current = await main.resource_monitor.sample()
+    checks.append(("현재 샘플에 필드 포함", all(field in current for field in SAMPLE_FIELDS + ("threads",))))
+    checks.append(("현재 태스크 수 집계", current["asyncio_tasks"] >= 1))
+
+    checks.append(("tracemalloc 미실행 시 비교는 409", await expect_status(main.diff_tracemalloc(), 409)))
+    checks.append(("frames=0은 400", await expect_status(main.start_tracemalloc(frames=0), 400)))
+
+    status = await main.start_tracemalloc(frames=1)
+    checks.append(("시작 후 tracing/기준 스냅샷", status["tracing"] and status["baseline_taken_at"]))
+
+    retained = [bytearray(1024) for _ in range(2000)]  # 약 2MB 증가
+    diff = await main.diff_tracemalloc(top=5, reset=True)
+    top = diff["top_growth"]
+    checks.append(("증가량 상위에 이 테스트의 할당 위치",
+                   bool(top) and top[0]["location"].endswith("test_resources.py:" + str(_retained_line()))
+                   and top[0]["size_diff_bytes"] >= 2000 * 1024))
+    diff = await main.diff_tracemalloc(top=5)
+    checks.append(("reset 후에는 같은 할당이 다시 보고되지 않음",
+                   all(stat["size_diff_bytes"] < 2000 * 1024 for stat in diff["top_growth"])))
+    del retained
+
+    status = await main.stop_tracemalloc()
+    checks.append(("중지 후 tracing 해제", not status["tracing"] and status["baseline_taken_at"] is None))
+
+
+def _retained_line() -> int:
+    """retained 리스트를 만드는 줄 번호"""
+    with open(__file__, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip().startswith("retained = [bytearray"):
+                return number
+    return -1
+
+
+def run_tests():
+    """가짜 샘플과 실제 엔드포인트 함수로 ResourceMonitor 검증"""
+    print("=" * 60)
+    print("리소스 모니터 테스트")
+    print("=" * 60)
+
+    checks = []
+
+    # 증가량 요약
+    monitor = ResourceMonitor(interval=60, history_size=3)
+    for i in range(4):
+        monitor.samples.append(make_sample(f"t{i}", 1000 + i * 100, 10 + i, None, 5))
+    current = make_sample("now", 2000, 20, 1, 9)
+    summary = monitor.summary(current, limit=2)
+    growth = summary["growth_since_first_sample"]
+    checks.append(("링 버퍼는 최근 3개만 보관 (첫 샘플 t1)", growth["since"] == "t1"))
+    checks.append(("RSS 증가량 = 2000 - 1100", growth["rss_bytes"] == 900))
+    checks.append(("FD 증가량 = 20 - 11", growth["open_fds"] == 9))
+    checks.append(("값이 없는 항목은 증가량에서 제외", "child_processes" not in growth))
+    checks.append(("limit 만큼 최근 샘플 반환", [s["timestamp"] for s in summary["samples"]] == ["t2", "t3"]))
+    checks.append(("샘플이 없으면 증가량 비어 있음",
+                   ResourceMonitor().summary(current, limit=10)["growth_since_first_sample"] == {}))
+
+    asyncio.run(run_endpoints(checks))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
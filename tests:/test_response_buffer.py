@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+응답 버퍼 테스트 스크립트
+크기 제한(UTF-8 문자 경계), 전체 길이/다이제스트, 초과분 파일 기록과 정리를 확인합니다.
+"""
+import os
+import sys
+import hashlib
+import tempfile
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import ResponseBuffer
+
+CHUNKS = ["Hello, ", "안녕하세요", " world!"]
+FULL_TEXT = "".join(CHUNKS)
+FULL_BYTES = FULL_TEXT.encode("utf-8")
+
+
+def run_tests():
+    """여러 크기 제한으로 버퍼 동작 검증"""
+    print("=" * 60)
+    print("응답 버퍼 테스트")
+    print("=" * 60)
+
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        main.RESPONSE_SPILL_DIR = os.path.join(tmp, "responses")
+
+        # 제한 이내: 그대로 보관
+        buffer = ResponseBuffer(max_bytes=1024, spill=True)
+        for chunk in CHUNKS:
+            buffer.append(chunk)
+        result = buffer.result()
+        checks.append(("제한 이내 응답은 전체 보관", result.text == FULL_TEXT and not result.truncated))
+        checks.append(("제한 이내 응답은 초과분 파일 없음", result.spill_file is None))
+
+        # 한글(3바이트) 중간에서 잘리는 제한: 문자 경계까지만 보관
+        buffer = ResponseBuffer(max_bytes=11, spill=True)
+        for chunk in CHUNKS:
+            buffer.append(chunk)
+        result = buffer.result()
+        checks.append(("문자 경계에서 자름 (11바이트 제한 -> 'Hello, 안')", result.text == "Hello, 안"))
+        checks.append(("kept_bytes는 실제 보관 바이트 (10)", result.kept_bytes == 10))
+        checks.append(("total_bytes는 전체 길이", result.total_bytes == len(FULL_BYTES)))
+        checks.append(("sha256은 전체 응답 기준", result.sha256 == hashlib.sha256(FULL_BYTES).hexdigest()))
+        checks.append(("잘림 표시", result.truncated))
+        with open(result.spill_file, "r", encoding="utf-8") as f:
+            checks.append(("초과분 파일에 전체 응답 기록", f.read() == FULL_TEXT))
+
+        # 초과분 파일 미사용
+        buffer = ResponseBuffer(max_bytes=5, spill=False)
+        for chunk in CHUNKS:
+            buffer.append(chunk)
+        result = buffer.result()
+        checks.append(("SPILL 미사용 시 파일 없음", result.spill_file is None and result.text == "Hello"))
+
+        # 실패한 시도의 초과분 파일 삭제
+        buffer = ResponseBuffer(max_bytes=5, spill=True)
+        buffer.append(FULL_TEXT)
+        spill_file = buffer.spill_file
+        buffer.discard()
+        checks.append(("discard()는 초과분 파일 삭제", spill_file and not os.path.exists(spill_file)))
+
+        # 보관 개수 제한
+        main.RESPONSE_SPILL_MAX_FILES = 3
+        for i in range(5):
+            buffer = ResponseBuffer(max_bytes=1, spill=True)
+            buffer.append(f"response {i}")
+            last = buffer.result()
+        remaining = sorted(os.listdir(main.RESPONSE_SPILL_DIR))
+        checks.append(("초과분 파일은 최근 3개만 유지",
+                       len(remaining) == 3 and os.path.basename(last.spill_file) == remaining[-1]))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+스태거/지터 테스트 스크립트
+스태거 오프셋 계산과, greet_agent의 지터 대기가 예약 실행에만 적용되고
+대기 중 드레인이 시작되면 바로 인사를 실행하는지 확인합니다.
+"""
+import os
+import sys
+import asyncio
+import tempfile
+from datetime import datetime
+from time import monotonic
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import build_interval_trigger, calculate_stagger_offset, greet_agent
+
+started = []  # 가짜 인사 실행 기록 (source, 시작 시각)
+
+
+async def fake_greet(source: str):
+    started.append((source, monotonic()))
+    return {"status": "success"}
+
+
+async def run_greetings(checks: list):
+    main._greet_agent = fake_greet
+    main.JITTER_SECONDS = 600
+    main.jitter_delay = lambda: 0.3
+
+    # 예약 실행: 지연 적용, 대기 중에도 진행 중 인사로 등록
+    start = monotonic()
+    scheduled = asyncio.create_task(greet_agent("scheduled"))
+    await asyncio.sleep(0.05)
+    checks.append(("지터 대기 중에도 in_flight_greetings에 등록", scheduled in main.in_flight_greetings))
+    await scheduled
+    checks.append(("예약 실행은 지연 후 시작 (0.3초)", started[-1][1] - start >= 0.3))
+    checks.append(("완료 후 in_flight_greetings에서 제거", scheduled not in main.in_flight_greetings))
+
+    # 수동 실행: 지연 없음
+    start = monotonic()
+    await greet_agent("manual")
+    checks.append(("수동 실행은 지연 없음", started[-1][0] == "manual"
+                   and started[-1][1] - start < 0.1))
+
+    # 지연 중 드레인: 기다리지 않고 바로 실행되며 드레인이 이를 기다림
+    main.jitter_delay = lambda: 30
+    count = len(started)
+    start = monotonic()
+    scheduled = asyncio.create_task(greet_agent("scheduled"))
+    await asyncio.sleep(0.05)
+    main.begin_drain()
+    await main.drain_greetings()
+    checks.append(("드레인 시 지터 대기를 끊고 인사 실행",
+                   len(started) == count + 1 and started[-1][0] == "scheduled" and monotonic() - start < 1))
+    checks.append(("드레인이 끝나기 전에 인사 완료", scheduled.done() and scheduled.result()["status"] == "success"))
+
+    # 드레인 시작 후의 예약 실행은 건너뜀
+    count = len(started)
+    result = await greet_agent("scheduled")
+    checks.append(("드레인 중 새 예약 실행은 SKIPPED", result["status"] == "skipped" and len(started) == count))
+
+
+def run_tests():
+    """스태거 오프셋과 greet_agent 지터/드레인 동작 검증"""
+    print("=" * 60)
+    print("스태거/지터 테스트")
+    print("=" * 60)
+
+    checks = []
+
+    # 스태거 오프셋
+    offset = calculate_stagger_offset("host-a", 30)
+    checks.append(("같은 키는 같은 오프셋", offset == calculate_stagger_offset("host-a", 30)))
+    checks.append(("오프셋은 윈도우(30분) 안", 0 <= offset < 30 * 60))
+    offsets = {calculate_stagger_offset(f"host-{i}", 30) for i in range(50)}
+    checks.append(("서로 다른 키는 분산됨 (50개 중 40개 이상 고유)", len(offsets) >= 40))
+    checks.append(("윈도우가 0이면 오프셋 0", calculate_stagger_offset("host-a", 0) == 0))
+
+    # 트리거에는 지터를 넣지 않음 (APScheduler에서 지터가 누적되므로)
+    main.JITTER_SECONDS = 600
+    trigger = build_interval_trigger(datetime.now(main.scheduler.timezone))
+    checks.append(("트리거 자체에는 지터 없음", trigger.jitter is None))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.LOG_DIR = tmp
+        asyncio.run(run_greetings(checks))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
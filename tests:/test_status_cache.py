@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+상태 응답 캐시 테스트 스크립트
+캐시 만료(TTL), 무효화, ETag/If-None-Match(304) 처리와 예방 윈도우 경계 계산을 확인합니다.
+"""
+import os
+import sys
+from datetime import datetime
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request
+
+import main
+from main import StatusCache, cached_json_response, seconds_until_prevent_boundary
+
+
+class FakeClock:
+    """main.monotonic 대체용 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_request(if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode("latin-1"))] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def run_tests():
+    """가짜 시계와 요청 객체로 캐시 동작 검증"""
+    print("=" * 60)
+    print("상태 응답 캐시 테스트")
+    print("=" * 60)
+
+    checks = []
+    clock = FakeClock()
+    original_monotonic = main.monotonic
+    main.monotonic = clock
+    try:
+        builds = []
+
+        def builder():
+            builds.append(clock.now)
+            return {"status": "running", "build": len(builds)}, 60.0
+
+        # TTL
+        cache = StatusCache()
+        body, etag = cache.get("/", builder)
+        cache.get("/", builder)
+        checks.append(("TTL 이내에는 빌더를 다시 호출하지 않음", len(builds) == 1))
+        clock.now += 59
+        cache.get("/", builder)
+        checks.append(("만료 직전까지 캐시 사용", len(builds) == 1))
+        clock.now += 2
+        body2, etag2 = cache.get("/", builder)
+        checks.append(("TTL이 지나면 다시 생성", len(builds) == 2))
+        checks.append(("내용이 바뀌면 ETag도 바뀜", etag != etag2))
+
+        # 무효화와 TTL 없는 항목
+        cache.get("/schedule", lambda: ({"job": "greet"}, None))
+        clock.now += 10 ** 6
+        cached_body, _ = cache.get("/schedule", lambda: ({"job": "changed"}, None))
+        checks.append(("TTL이 None이면 무효화 전까지 유지", cached_body == b'{"job":"greet"}'))
+        cache.invalidate()
+        cached_body, _ = cache.get("/schedule", lambda: ({"job": "changed"}, None))
+        checks.append(("invalidate() 후 다시 생성", cached_body == b'{"job":"changed"}'))
+
+        # ETag / If-None-Match
+        main.status_cache = StatusCache()
+        response = cached_json_response(make_request(), "/", builder)
+        etag = response.headers["etag"]
+        checks.append(("200 응답에 ETag 포함", response.status_code == 200 and etag.startswith('"')))
+        response = cached_json_response(make_request(etag), "/", builder)
+        checks.append(("일치하는 If-None-Match는 304 (본문 없음)", response.status_code == 304 and response.body == b""))
+        response = cached_json_response(make_request(f'"other", W/{etag}'), "/", builder)
+        checks.append(("목록/약한 ETag도 일치로 처리", response.status_code == 304))
+        response = cached_json_response(make_request("*"), "/", builder)
+        checks.append(("If-None-Match: * 는 304", response.status_code == 304))
+        response = cached_json_response(make_request('"stale"'), "/", builder)
+        checks.append(("다른 ETag는 200", response.status_code == 200 and response.body))
+    finally:
+        main.monotonic = original_monotonic
+
+    # 예방 윈도우 경계까지 남은 시간 (23:00 - 04:00)
+    main.PREVENT_START_TIME, main.PREVENT_END_TIME = "23:00", "04:00"
+    checks.append(("22:30 -> 시작까지 30분",
+                   seconds_until_prevent_boundary(datetime(2025, 10, 28, 22, 30)) == 30 * 60))
+    checks.append(("23:30 -> 종료까지 4시간 30분",
+                   seconds_until_prevent_boundary(datetime(2025, 10, 28, 23, 30)) == 4.5 * 3600))
+    checks.append(("04:00 정각 -> 다음 시작까지 19시간",
+                   seconds_until_prevent_boundary(datetime(2025, 10, 29, 4, 0)) == 19 * 3600))
+    main.PREVENT_START_TIME = main.PREVENT_END_TIME = None
+    checks.append(("예방 윈도우 미설정 시 None", seconds_until_prevent_boundary() is None))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
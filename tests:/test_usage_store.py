@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+사용량 집계 저장소 테스트 스크립트
+시도별 누계, 파생 지표, 보관 기간 정리, 여러 프로세스의 저장 병합을 확인합니다.
+"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+# 프로젝트 루트를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import UsageStore, _describe_usage
+
+SUCCESS = {
+    "status": "success",
+    "input_tokens": 100,
+    "output_tokens": 20,
+    "cache_creation_input_tokens": 0,
+    "cache_read_input_tokens": 300,
+    "wall_ms": 1500,
+    "api_ms": 1200,
+    "cost_usd": 0.0025,
+}
+TIMEOUT = {"status": "timeout", "wall_ms": 60000}
+
+
+def run_tests():
+    """임시 파일로 UsageStore 동작 검증"""
+    print("=" * 60)
+    print("사용량 집계 저장소 테스트")
+    print("=" * 60)
+
+    checks = []
+    main.USAGE_FLUSH_INTERVAL = 3600  # only_if_due 저장은 건너뛰도록 설정
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.json")
+
+        # 누계
+        store = UsageStore(path)
+        store.record("scheduled", SUCCESS)
+        store.record("scheduled", TIMEOUT)
+        totals = store.jobs["scheduled"]
+        checks.append(("시도 2 / 성공 1 / 실패 1",
+                       (totals["attempts"], totals["successes"], totals["failures"]) == (2, 1, 1)))
+        checks.append(("토큰과 시간 합산", totals["input_tokens"] == 100 and totals["wall_ms"] == 61500))
+        checks.append(("오늘 날짜 누계도 반영", store.days[today]["scheduled"]["attempts"] == 2))
+
+        # 파생 지표
+        described = _describe_usage(totals)
+        checks.append(("평균 wall 시간 = 30750ms", described["avg_wall_ms"] == 30750.0))
+        checks.append(("캐시 적중률 = 300 / 400", described["cache_read_ratio"] == 0.75))
+        checks.append(("시도가 없어도 0으로 나누지 않음",
+                       _describe_usage(main._empty_usage_totals())["avg_cost_usd"] == 0.0))
+
+        # 보관 기간 정리
+        old_day = (datetime.now() - timedelta(days=main.USAGE_RETENTION_DAYS + 1)).strftime('%Y-%m-%d')
+        kept_day = (datetime.now() - timedelta(days=main.USAGE_RETENTION_DAYS - 1)).strftime('%Y-%m-%d')
+        days = {old_day: {}, kept_day: {}, today: {}}
+        UsageStore._prune(days)
+        checks.append(("보관 기간이 지난 날짜만 정리", sorted(days) == sorted([kept_day, today])))
+
+        # 두 프로세스가 같은 파일에 번갈아 저장해도 서로의 누계를 지우지 않음
+        store.flush()
+        other = UsageStore(path)
+        other.record("batch", SUCCESS)
+        store.record("scheduled", SUCCESS)
+        other.flush()
+        store.flush()
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        checks.append(("다른 저장소의 batch 누계 유지", saved["jobs"].get("batch", {}).get("attempts") == 1))
+        checks.append(("scheduled 누계는 한 번씩만 더해짐 (3)", saved["jobs"]["scheduled"]["attempts"] == 3))
+        checks.append(("scheduled 비용 합산 = 0.005", round(saved["jobs"]["scheduled"]["cost_usd"], 6) == 0.005))
+        checks.append(("저장 후 메모리 집계도 최신 파일 기준", store.jobs.get("batch", {}).get("attempts") == 1))
+
+        # 변경이 없으면 저장하지 않음
+        mtime = os.path.getmtime(path)
+        store.flush()
+        checks.append(("변경 없으면 파일 유지", os.path.getmtime(path) == mtime))
+
+        # 스레드에서 저장하는 동안 기록된 시도는 다음 저장으로 넘어감
+        async def flush_while_recording():
+            store.record("scheduled", SUCCESS)
+            flushing = asyncio.create_task(store.flush_async())
+            await asyncio.sleep(0)
+            store.record("manual", SUCCESS)
+            await flushing
+            await store.flush_async(only_if_due=True)
+
+        asyncio.run(flush_while_recording())
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        checks.append(("flush_async 저장 (scheduled 4)", saved["jobs"]["scheduled"]["attempts"] == 4))
+        checks.append(("저장 중 기록도 메모리 집계에 유지",
+                       store.jobs.get("manual", {}).get("attempts") == 1 and store.dirty))
+        checks.append(("저장 중 기록은 간격 전 only_if_due로 저장 안 함", "manual" not in saved["jobs"]))
+        store.flush()
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        checks.append(("다음 저장에서 manual 반영", saved["jobs"]["manual"]["attempts"] == 1
+                       and saved["jobs"]["scheduled"]["attempts"] == 4))
+
+    passed = 0
+    for name, ok in checks:
+        print(f"{'✓ PASS' if ok else '✗ FAIL'} | {name}")
+        passed += bool(ok)
+
+    print("=" * 60)
+    print(f"테스트 결과: {passed} passed, {len(checks) - passed} failed")
+    print("=" * 60)
+
+    return passed == len(checks)
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)